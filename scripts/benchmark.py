@@ -0,0 +1,486 @@
+"""
+Micro-benchmarks for the translitcodec fast paths.
+
+Run from the repository root::
+
+  python scripts/benchmark.py            # everything
+  python scripts/benchmark.py column     # selected benchmarks
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import translitcodec  # noqa: E402
+
+
+BENCHMARKS = {}
+
+WORDS = ['Zażółć', 'gęślą', 'jaźń', 'Straße', 'café', 'naïve', 'Ångström',
+         'crème', 'brûlée', '£100', '€5', 'Łódź', 'smörgåsbord', 'plain',
+         'ascii', 'text', 'with', 'some', 'words', 'façade']
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def best_of(func, number=1, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def report(label, seconds, baseline=None):
+    line = '  %-40s %10.3f ms' % (label, seconds * 1000)
+    if baseline is not None:
+        line += '   %6.1fx' % (baseline / seconds)
+    print(line)
+
+
+def sample_values(count, distinct, seed=0):
+    rnd = random.Random(seed)
+    pool = [' '.join(rnd.choice(WORDS) for _ in range(4)) + ' %d' % i
+            for i in range(distinct)]
+    return [rnd.choice(pool) for _ in range(count)]
+
+
+@benchmark
+def column():
+    """transliterate_column() against a per-row long_encode loop."""
+    rows = 200000
+    for ratio in (1, 10, 100, 1000):
+        values = sample_values(rows, rows // ratio)
+        loop = best_of(lambda: [translitcodec.long_encode(v)[0] for v in values])
+        dedup = best_of(lambda: translitcodec.transliterate_column(values))
+        print('rows/distinct = %d' % ratio)
+        report('per-row long_encode', loop)
+        report('transliterate_column', dedup, loop)
+
+
+@benchmark
+def array():
+    """transliterate_array() against a single_encode loop."""
+    import numpy
+    values = sample_values(1000000, 5000)
+    values = [v[:12] for v in values]
+    array = numpy.array(values)
+    loop = best_of(lambda: [translitcodec.single_encode(v)[0] for v in values],
+                   repeat=3)
+    translitcodec.transliterate_array(array[:1])
+    vectorized = best_of(lambda: translitcodec.transliterate_array(array),
+                         repeat=3)
+    print('1M strings of up to 12 characters')
+    report('single_encode loop', loop)
+    report('transliterate_array', vectorized, loop)
+
+
+@benchmark
+def lines():
+    """iter_transliterate() against codecs.encode() per line."""
+    import codecs
+    values = [v + '\n' for v in sample_values(200000, 200000)]
+    loop = best_of(lambda: [codecs.encode(v, 'translit/long') for v in values])
+    batched = best_of(lambda: list(translitcodec.iter_transliterate(values)))
+    print('200k distinct lines')
+    report('codecs.encode per line', loop)
+    report('iter_transliterate', batched, loop)
+
+
+@benchmark
+def handlers():
+    """Error handler calls for a character cp1252 cannot encode."""
+    import codecs
+    translitcodec.register_error_handlers('cp1252')
+    exc = UnicodeEncodeError('cp1252', 'Zażółć', 2, 3, 'unencodable')
+    for name in ('replace/translit/short', 'replace/translit/short/cp1252'):
+        handler = codecs.lookup_error(name)
+        report(name + ' (x100k)', best_of(lambda: handler(exc), 100000) * 1e5)
+
+
+@benchmark
+def unmappable():
+    """find_unmappable() against re-encoding after each error."""
+    def retry(text):
+        positions = []
+        offset = 0
+        while True:
+            try:
+                text[offset:].encode('latin-1', 'strict/translit/long')
+                return positions
+            except UnicodeEncodeError as exc:
+                positions.append(offset + exc.start)
+                offset += exc.start + 1
+
+    words = WORDS + ['☺', '另', '☃']
+    rnd = random.Random(0)
+    text = ' '.join(rnd.choice(words) for _ in range(20000))
+    assert retry(text) == translitcodec.find_unmappable(text, 'long', 'latin-1')
+    print('%d characters, %d unmappable' % (
+        len(text), len(retry(text))))
+    loop = best_of(lambda: retry(text), repeat=3)
+    report('encode until the next error', loop)
+    report('find_unmappable', best_of(lambda: translitcodec.find_unmappable(
+        text, 'long', 'latin-1')), loop)
+
+
+@benchmark
+def spans():
+    """needs_transliteration() against comparing long_encode() output."""
+    rnd = random.Random(0)
+    ascii_words = [w for w in WORDS if w.isascii()]
+    plain = [' '.join(rnd.choice(ascii_words) for _ in range(8))
+             for _ in range(20000)]
+    mixed = [' '.join(rnd.choice(WORDS) for _ in range(8))
+             for _ in range(20000)]
+    for label, values in (('ASCII', plain), ('mixed', mixed)):
+        assert [translitcodec.needs_transliteration(v) for v in values] == [
+            translitcodec.long_encode(v)[0] != v for v in values]
+        print('20k %s strings' % label)
+        loop = best_of(lambda: [translitcodec.long_encode(v)[0] != v
+                                for v in values], repeat=3)
+        report('long_encode(v)[0] != v', loop)
+        report('needs_transliteration', best_of(
+            lambda: [translitcodec.needs_transliteration(v) for v in values],
+            repeat=3), loop)
+
+
+@benchmark
+def lengths():
+    """transliterated_length() and encoded_length() against building the
+    output."""
+    import codecs
+    values = sample_values(50000, 50000)
+    print('50k strings')
+    loop = best_of(lambda: [len(translitcodec.long_encode(v)[0])
+                            for v in values], repeat=3)
+    report('len(long_encode(v)[0])', loop)
+    report('transliterated_length', best_of(
+        lambda: [translitcodec.transliterated_length(v) for v in values],
+        repeat=3), loop)
+    loop = best_of(lambda: [len(codecs.encode(v, 'translit/long/utf8'))
+                            for v in values], repeat=3)
+    report('len(codecs.encode(v, translit/long/utf8))', loop)
+    report('encoded_length', best_of(
+        lambda: [translitcodec.encoded_length(v) for v in values],
+        repeat=3), loop)
+
+
+@benchmark
+def prefix():
+    """transliterate_prefix() against slicing the whole transliteration."""
+    rnd = random.Random(0)
+    text = ' '.join(rnd.choice(WORDS) for _ in range(200000))
+    print('%d character document' % len(text))
+    for limit in (80, 4096):
+        assert translitcodec.long_encode(text)[0].startswith(
+            translitcodec.transliterate_prefix(text, limit))
+        loop = best_of(lambda: translitcodec.long_encode(text)[0][:limit],
+                       repeat=3)
+        report('long_encode(text)[0][:%d]' % limit, loop)
+        report('transliterate_prefix(text, %d)' % limit, best_of(
+            lambda: translitcodec.transliterate_prefix(text, limit),
+            number=100), loop)
+
+
+@benchmark
+def offsets():
+    """transliterate_with_offsets() against plain long_encode()."""
+    rnd = random.Random(0)
+    ascii_words = [w for w in WORDS if w.isascii()]
+    for label, words in (('mixed', WORDS), ('mostly ASCII',
+                                            ascii_words * 10 + WORDS)):
+        text = ' '.join(rnd.choice(words) for _ in range(100000))
+        print('%d character %s document' % (len(text), label))
+        plain = best_of(lambda: translitcodec.long_encode(text), repeat=3)
+        report('long_encode', plain)
+        report('transliterate_with_offsets', best_of(
+            lambda: translitcodec.transliterate_with_offsets(text),
+            repeat=3), plain)
+
+
+@benchmark
+def tokens():
+    """transliterate_tokens() against codecs.encode() per token."""
+    import codecs
+    rnd = random.Random(0)
+    vocabulary = ['%s%d' % (rnd.choice(WORDS), i) for i in range(20000)]
+    weights = [1.0 / rank for rank in range(1, len(vocabulary) + 1)]
+    batches = [rnd.choices(vocabulary, weights, k=128) for _ in range(1000)]
+    print('1000 batches of 128 tokens, Zipf distributed')
+    loop = best_of(lambda: [[codecs.encode(token, 'translit/long')
+                             for token in batch] for batch in batches],
+                   repeat=3)
+    report('codecs.encode per token', loop)
+    report('transliterate_tokens', best_of(
+        lambda: [translitcodec.transliterate_tokens(batch)
+                 for batch in batches], repeat=3), loop)
+
+
+@benchmark
+def edits():
+    """ShadowDocument.edit() against transliterating the whole document."""
+    from translitcodec.incremental import ShadowDocument
+    rnd = random.Random(0)
+    text = ' '.join(rnd.choice(WORDS) for _ in range(200000))
+    doc = ShadowDocument(text)
+    positions = [rnd.randrange(len(text)) for _ in range(1000)]
+
+    def type_chars():
+        for position in positions:
+            doc.edit(position, position, 'ż')
+        for position in reversed(positions):
+            doc.edit(position, position + 1, '')
+
+    print('%d character document, 2000 single character edits' % len(text))
+    full = best_of(lambda: translitcodec.long_encode(text), repeat=3) * 2000
+    report('long_encode after each edit', full)
+    report('ShadowDocument.edit', best_of(type_chars, repeat=3), full)
+    assert doc.output == translitcodec.long_encode(text)[0]
+
+
+@benchmark
+def fold():
+    """translit/long/fold against translit/long followed by casefold()."""
+    import codecs
+    values = sample_values(200000, 200000)
+    print('200k strings')
+    loop = best_of(lambda: [codecs.encode(v, 'translit/long').casefold()
+                            for v in values], repeat=3)
+    report('translit/long + casefold()', loop)
+    report('translit/long/fold', best_of(
+        lambda: [codecs.encode(v, 'translit/long/fold') for v in values],
+        repeat=3), loop)
+
+
+@benchmark
+def slugs():
+    """slugify() against translit/long, lower() and a regex."""
+    import codecs
+    import re
+    collapse = re.compile('[^a-z0-9]+').sub
+
+    def three_passes(text):
+        text = codecs.encode(text, 'translit/long').lower()
+        return collapse('-', text).strip('-')
+
+    titles = sample_values(200000, 200000)
+    assert [three_passes(t) for t in titles[:1000]] == [
+        translitcodec.slugify(t) for t in titles[:1000]]
+    print('200k titles')
+    loop = best_of(lambda: [three_passes(t) for t in titles], repeat=3)
+    report('three passes', loop)
+    report('slugify', best_of(
+        lambda: [translitcodec.slugify(t) for t in titles], repeat=3), loop)
+    rnd = random.Random(0)
+    text = ' '.join(rnd.choice(WORDS) for _ in range(100000))
+    print('%d character document, 60 character slug' % len(text))
+    loop = best_of(lambda: three_passes(text)[:60], repeat=3)
+    report('three passes, then cut', loop)
+    report('slugify(max_len=60)', best_of(
+        lambda: translitcodec.slugify(text, max_len=60), number=100), loop)
+
+
+@benchmark
+def compose():
+    """A composed table against a mode and two mappings applied in turn."""
+    import codecs
+    quotes = str.maketrans({'"': None, "'": None, '`': None})
+    dashes = str.maketrans({'-': ' ', '_': ' ', '/': ' '})
+    values = sample_values(200000, 200000)
+    table = translitcodec.compose('long', quotes, dashes)
+    print('200k strings')
+    loop = best_of(lambda: [
+        codecs.encode(v, 'translit/long').translate(quotes).translate(dashes)
+        for v in values], repeat=3)
+    report('three passes', loop)
+    report('composed table', best_of(
+        lambda: [table.translate(v) for v in values], repeat=3), loop)
+    report('compose(), cached', best_of(
+        lambda: translitcodec.compose('long', quotes, dashes), number=1000))
+
+
+@benchmark
+def overlays():
+    """Per-tenant overrides of translit/long: ChainMap, copies, compose()."""
+    import collections
+    import unicodedata
+    from translitcodec import tables
+    tenants = [{'ß': value} for value in ('s', 'ss', 'sz', 'B')]
+    values = sample_values(200000, 200000)
+    chained = collections.ChainMap(str.maketrans(tenants[0]),
+                                   translitcodec.long_table)
+    composed = translitcodec.compose('long', overrides=tenants[0])
+    print('200k strings')
+    loop = best_of(lambda: [unicodedata.normalize('NFKC', v).translate(
+        chained) for v in values], repeat=3)
+    report('ChainMap overlay', loop)
+    report('composed variant', best_of(
+        lambda: [composed.translate(v) for v in values], repeat=3), loop)
+    copy = dict(translitcodec.long_table)
+    copy.update(str.maketrans(tenants[0]))
+    copied = sys.getsizeof(copy) + sum(
+        sys.getsizeof(v) for v in set(copy.values()))
+    for tenant in tenants:
+        translitcodec.compose('long', overrides=tenant)
+    print('memory per variant, %d tenants' % len(tenants))
+    print('  %-40s %8d bytes' % ('copy of long_table', copied))
+    for info in tables.cache_info()[:len(tenants)]:
+        print('  %-40s %8d bytes' % (info.fingerprint[:12], info.size))
+
+
+@benchmark
+def locales():
+    """translit/long@sv against translit/long with a pass for Swedish."""
+    import codecs
+    from translitcodec.locales import _deltas
+    corrections = str.maketrans(_deltas['sv'])
+    values = sample_values(200000, 200000)
+    print('200k strings')
+    loop = best_of(lambda: [codecs.encode(v, 'translit/long')
+                            for v in values], repeat=3)
+    report('translit/long', loop)
+    report('translit/long@sv', best_of(
+        lambda: [codecs.encode(v, 'translit/long@sv') for v in values],
+        repeat=3), loop)
+    report('Swedish pass, then translit/long', best_of(
+        lambda: [codecs.encode(v.translate(corrections), 'translit/long')
+                 for v in values], repeat=3), loop)
+
+
+@benchmark
+def decomposed():
+    """Helpers on NFD text against the same text composed."""
+    import unicodedata
+    composed = sample_values(50000, 50000)
+    decomposed = [unicodedata.normalize('NFD', v) for v in composed]
+    print('50k strings')
+    for name in ('transliterated_length', 'iter_spans',
+                 'transliterate_with_offsets'):
+        func = getattr(translitcodec, name)
+        loop = best_of(lambda: [list(func(v)) if name == 'iter_spans'
+                                else func(v) for v in composed], repeat=3)
+        report(name + ', NFC', loop)
+        report(name + ', NFD', best_of(
+            lambda: [list(func(v)) if name == 'iter_spans' else func(v)
+                     for v in decomposed], repeat=3), loop)
+
+
+@benchmark
+def words():
+    """WordOverrides at 1k, 10k and 100k entries against a replace loop."""
+    import re
+    from translitcodec.words import WordOverrides
+    rnd = random.Random(0)
+    words = [w for w in WORDS if w[:1].isalnum()]
+    entries = ['%s%d' % (rnd.choice(words), i) for i in range(100000)]
+    values = sample_values(20000, 20000)
+    # Some texts hold an override.
+    values = [v + ' ' + rnd.choice(entries[:1000]) if i % 10 == 0 else v
+              for i, v in enumerate(values)]
+    print('20k strings')
+    plain = best_of(lambda: [translitcodec.long_encode(v)[0]
+                             for v in values], repeat=3)
+    report('long_encode, no overrides', plain)
+    for size in (1000, 10000, 100000):
+        mapping = {entry: entry.upper() for entry in entries[:size]}
+        if size == 1000:
+            patterns = [(re.compile(r'\b%s\b' % re.escape(key)), value)
+                        for key, value in mapping.items()]
+
+            def replace_loop(text):
+                for pattern, value in patterns:
+                    text = pattern.sub(value, text)
+                return translitcodec.long_encode(text)[0]
+            # Timed on 1k strings.
+            report('replace loop, 1k entries (estimated)', 20 * best_of(
+                lambda: [replace_loop(v) for v in values[:1000]], repeat=1),
+                plain)
+        overrides = WordOverrides(mapping)
+        report('WordOverrides, %dk entries' % (size // 1000), best_of(
+            lambda: [overrides.transliterate(v) for v in values], repeat=3),
+            plain)
+    # Phrases sharing their first words, as with "New ..." and "San ...".
+    mapping = {'%s %d' % (entry, i): entry for entry in entries[:10]
+               for i in range(1000)}
+    values = [v + ' %s %d' % (rnd.choice(entries[:10]), rnd.randrange(2000))
+              for v in values]
+    overrides = WordOverrides(mapping)
+    report('WordOverrides, 1k phrases per word', best_of(
+        lambda: [overrides.transliterate(v) for v in values], repeat=3),
+        plain)
+
+
+@benchmark
+def rules():
+    """translit/gost and translit/elot against their tables alone."""
+    import unicodedata
+    from translitcodec import rules
+    rnd = random.Random(0)
+    texts = {
+        'gost': ('Цирк «Щелкунчик» на улице Чехова, ЦУМ и отец с цаплей '
+                 'съели объёмный щавель'),
+        'elot': ('Ευαγγέλιο, αυτός ο ουρανός και το μπαλκόνι στην Αθήνα '
+                 'ευχαριστώ τον άγγελο'),
+    }
+    for name, text in sorted(texts.items()):
+        words = text.split()
+        values = [' '.join(rnd.sample(words, 5)) for _ in range(50000)]
+        rule_set = rules._rule_set(name)
+        print('%s, 50k strings' % name)
+        table = best_of(lambda: [unicodedata.normalize('NFKC', v).translate(
+            rule_set.table) for v in values], repeat=3)
+        report('NFKC and table only', table)
+        report('rules', best_of(lambda: [rule_set.translate(v)
+                                         for v in values], repeat=3), table)
+
+
+@benchmark
+def variants():
+    """transliterate_variants() against three encoder calls."""
+    values = sample_values(200000, 200000)
+    encoders = (translitcodec.long_encode, translitcodec.short_encode,
+                translitcodec.single_encode)
+    print('200k strings')
+    loop = best_of(lambda: [[encode(v)[0] for encode in encoders]
+                            for v in values], repeat=3)
+    report('long, short and one encoders', loop)
+    report('transliterate_variants', best_of(
+        lambda: [translitcodec.transliterate_variants(v) for v in values],
+        repeat=3), loop)
+    column = sample_values(200000, 20000)
+    print('200k strings, 20k distinct')
+    loop = best_of(lambda: [translitcodec.transliterate_column(column, mode)
+                            for mode in ('long', 'short', 'one')], repeat=3)
+    report('transliterate_column per mode', loop)
+    report('transliterate_variants_column', best_of(
+        lambda: translitcodec.transliterate_variants_column(column),
+        repeat=3), loop)
+
+
+@benchmark
+def telemetry():
+    """SpaceSaving.add() at the default capacity, per event."""
+    from translitcodec.telemetry import SpaceSaving
+    rnd = random.Random(0)
+    # Half of the events from a long tail of 20k distinct items keeps
+    # the counter full and evicting.
+    events = [chr(0x4e00 + (int(rnd.paretovariate(0.8)) if rnd.random() < 0.5
+                            else rnd.randrange(20000)) % 20000)
+              for _ in range(200000)]
+    counter = SpaceSaving(256)
+    seconds = best_of(lambda: list(map(counter.add, events)), repeat=3)
+    print('  %-40s %10.3f us' % ('per event, 200k events',
+                                 seconds / len(events) * 1e6))
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        func = BENCHMARKS[name]
+        print('%s: %s' % (name, func.__doc__))
+        func()
@@ -0,0 +1,137 @@
+"""Tests for the bulk transliteration helpers.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import codecs
+from unittest import TestCase, skipIf
+
+import translitcodec
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ColumnTests(TestCase):
+    data = ['£ ☹', 'wøóf', None, 'méåw', 'wøóf', '£ ☹']
+
+    def test_list(self):
+        expected = [None if v is None else codecs.encode(v, 'translit/long')
+                    for v in self.data]
+        assert translitcodec.transliterate_column(self.data) == expected
+
+    def test_mode(self):
+        assert translitcodec.transliterate_column(['méåw'], 'short') == ['meaw']
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            translitcodec.transliterate_column(['a'], 'medium')
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_str_array(self):
+        values = numpy.array([['£', 'wøóf'], ['£', 'méåw']])
+        result = translitcodec.transliterate_column(values)
+        assert result.shape == (2, 2)
+        assert result.tolist() == [['GBP', 'woof'], ['GBP', 'meaaw']]
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_object_array(self):
+        values = numpy.array(['£', None, 'wøóf'], dtype=object)
+        result = translitcodec.transliterate_column(values, 'one')
+        assert result.dtype == object
+        assert result.tolist() == ['£', None, 'woof']
+
+
+class ArrayTests(TestCase):
+    data = ['£ ☹ wøóf méåw', 'é', 'ﬁ', '\U0001d400', '', 'plain']
+
+    def test_fallback(self):
+        assert translitcodec.transliterate_array(['£ wøóf']) == ['£ woof']
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_matches_single_encode(self):
+        values = numpy.array(self.data).reshape(2, 3)
+        result = translitcodec.transliterate_array(values)
+        assert result.shape == (2, 3)
+        assert result.ravel().tolist() == [
+            translitcodec.single_encode(value)[0] for value in self.data]
+
+
+class IterTests(TestCase):
+    lines = ['£ ☹\n', 'wøóf méåw\n', '́ starts with a mark', '', 'a\x00b']
+
+    def test_matches_codec(self):
+        for batch_size in (1, 2, 100):
+            result = list(translitcodec.iter_transliterate(
+                self.lines, 'short', batch_size=batch_size))
+            assert result == [codecs.encode(line, 'translit/short')
+                              for line in self.lines]
+
+    def test_lazy(self):
+        def lines():
+            yield 'wøóf'
+            raise AssertionError('read past the first batch')
+        result = translitcodec.iter_transliterate(lines(), batch_size=1)
+        assert next(result) == 'woof'
+
+
+class TokenTests(TestCase):
+    tokens = ['Straße', 'für', '£5', '', '́', 'x', 'ﬁ', 'a\x00b']
+
+    def test_matches_codec(self):
+        outputs, boundaries = translitcodec.transliterate_tokens(self.tokens)
+        assert outputs == [codecs.encode(token, 'translit/long')
+                           for token in self.tokens]
+        assert boundaries.typecode == 'I'
+        joined = ''.join(outputs)
+        assert [joined[start:end] for start, end in zip(
+            boundaries, boundaries[1:])] == outputs
+        assert boundaries[-1] == len(joined)
+
+    def test_empty(self):
+        outputs, boundaries = translitcodec.transliterate_tokens([])
+        assert outputs == []
+        assert list(boundaries) == [0]
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            translitcodec.transliterate_tokens(['ascii'], 'medium')
+
+
+class VariantsTests(TestCase):
+    texts = ['£ Straße', 'ascii', '', 'ﬁ Łódź ½', 'Ⅻ wøóf', 'a\x00b', '́x']
+    modes = ('long', 'short', 'one', 'long/fold', 'gost')
+
+    def test_matches_codec(self):
+        for text in self.texts:
+            assert translitcodec.transliterate_variants(text, self.modes) == {
+                mode: codecs.encode(text, 'translit/' + mode)
+                for mode in self.modes}
+
+    def test_default_modes(self):
+        assert list(translitcodec.transliterate_variants('é')) == [
+            'long', 'short', 'one']
+
+    def test_column(self):
+        values = self.texts + [None, '£ Straße']
+        columns = translitcodec.transliterate_variants_column(
+            values, self.modes)
+        assert columns == {
+            mode: translitcodec.transliterate_column(values, mode)
+            for mode in self.modes}
+        assert translitcodec.transliterate_variants_column([]) == {
+            'long': [], 'short': [], 'one': []}
+
+    def test_column_separator(self):
+        values = ['a\x00ß', 'ß']
+        assert translitcodec.transliterate_variants_column(
+            values, ['long'])['long'] == ['a\x00ss', 'ss']
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            translitcodec.transliterate_variants('ascii', ['medium'])
+        with self.assertRaises(ValueError):
+            translitcodec.transliterate_variants_column([], ['medium'])
@@ -5,6 +5,9 @@
 
 """
 import codecs
+import subprocess
+import sys
+import unicodedata
 import translitcodec
 from unittest import TestCase
 
@@ -39,6 +42,10 @@ class CodecTests(TestCase):
 
         assert codecs.encode(self.data, 'translit/one/ascii', 'replace') == b'? ? woof meaw'
 
+    def test_translit_hyphenated_encoding(self):
+        assert self.data.encode('translit/long/utf-16-le') == (
+            'GBP :-( woof meaaw'.encode('utf-16-le'))
+
     def test_ascii_level_characters_remain(self):
         assert codecs.encode("'", 'translit/long') == "'"
 
@@ -100,3 +107,95 @@ class ErrorHandlersTests(TestCase):
     def test_strict_one(self):
         with self.assertRaises(UnicodeEncodeError):
             self._process('strict/translit/one')
+
+
+class CachedErrorHandlersTests(TestCase):
+    data = 'Zażółć ǿ \u00f8\u0301 ﬁ ½ € ☺另 e\u0301 ø€' * 2
+    page = 'ISO-8859-2'
+
+    @staticmethod
+    def reference(exc, table, unknown):
+        char = unicodedata.normalize('NFKC', exc.object[exc.start:exc.end])[0]
+        new_char = char.translate(table)
+        return (unknown if char == new_char else new_char), exc.start + 1
+
+    def expected(self, table, unknown):
+        codecs.register_error(
+            'test/reference',
+            lambda exc: self.reference(exc, table, unknown))
+        return codecs.encode(self.data, self.page, 'test/reference')
+
+    def test_cached(self):
+        for mode, table in (('long', translitcodec.long_table),
+                            ('short', translitcodec.short_table),
+                            ('one', translitcodec.single_table)):
+            for errors, unknown in (('replace', '?'), ('ignore', '')):
+                assert codecs.encode(
+                    self.data, self.page, '%s/translit/%s' % (errors, mode)
+                ) == self.expected(table, unknown)
+
+    def test_precomputed(self):
+        names = translitcodec.register_error_handlers(self.page)
+        assert 'replace/translit/short/iso8859-2' in names
+        for name in names:
+            errors, _, mode, _ = name.split('/')
+            if errors == 'strict':
+                with self.assertRaises(UnicodeEncodeError):
+                    codecs.encode(self.data, self.page, name)
+            else:
+                assert codecs.encode(self.data, self.page, name) == \
+                    codecs.encode(self.data, self.page,
+                                  '%s/translit/%s' % (errors, mode))
+
+
+class FoldTests(TestCase):
+    data = 'Straße £ ☹ WØÓF MÉÅW ΣΑΣ'
+
+    def test_translit_long_fold(self):
+        assert codecs.encode(self.data, 'translit/long/fold') == (
+            'strasse gbp :-( woof meaaw σασ')
+
+    def test_translit_short_fold_ascii(self):
+        assert codecs.encode('Straße £ WØÓF', 'translit/short/fold/ascii') == (
+            b'strasse gbp woof')
+
+    def test_matches_two_passes(self):
+        for mode in ('long', 'short', 'one'):
+            encode = translitcodec._mode_encoder(mode)
+            assert codecs.encode(self.data, 'translit/%s/fold' % mode) == (
+                encode(self.data)[0].casefold())
+
+    def test_whole_table(self):
+        # Characters outside these are left alone by both tables and
+        # casefolding.
+        cased = {cp for cp in range(sys.maxunicode + 1)
+                 if chr(cp).casefold() != chr(cp)}
+        for mode in ('long', 'short', 'one'):
+            table = translitcodec._mode_table(mode)
+            folded = translitcodec._mode_table(mode + '/fold')
+            for cp in cased | set(table) | set(folded):
+                char = chr(cp)
+                assert char.translate(folded) == (
+                    char.translate(table).casefold()), (mode, hex(cp))
+
+
+class LazyImportTests(TestCase):
+
+    def test_helpers_loaded_on_use(self):
+        script = (
+            'import codecs, sys, translitcodec\n'
+            'codecs.encode("Москва", "translit/long")\n'
+            'print(sorted(name for name in sys.modules'
+            ' if name.startswith("translitcodec.")))\n'
+            'codecs.encode("Москва", "translit/gost")\n'
+            'print("translitcodec.rules" in sys.modules)\n')
+        output = subprocess.check_output([sys.executable, '-c', script])
+        assert output.split(b'\n')[:2] == [
+            b"['translitcodec._unicode', 'translitcodec.locales']", b'True']
+
+    def test_helpers(self):
+        assert translitcodec.slugify('Ærø') == 'aero'
+        assert translitcodec.gost_encode('Щ') == ('Shh', 1)
+        assert 'transliterate_column' in dir(translitcodec)
+        with self.assertRaises(AttributeError):
+            translitcodec.no_such_helper
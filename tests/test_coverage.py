@@ -0,0 +1,88 @@
+"""Tests for the corpus coverage analyzer.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import gzip
+import os
+import shutil
+import tempfile
+import unicodedata
+from unittest import TestCase
+
+import translitcodec
+from translitcodec import coverage
+
+
+class CoverageTests(TestCase):
+    lines = ['£ ☹ wøóf méåw\n', '☃☃ ﬁ\n', 'plain\n'] * 50
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        with open(os.path.join(self.dir, 'a.txt'), 'w', encoding='utf-8') as fh:
+            fh.writelines(self.lines)
+        with gzip.open(os.path.join(self.dir, 'b.gz'), 'wt', encoding='utf-8') as fh:
+            fh.writelines(self.lines)
+
+    def test_report(self):
+        report = coverage.analyze([self.dir], jobs=1)
+        text = ''.join(self.lines) * 2
+        assert report['files'] == 2
+        assert report['characters'] == len(text)
+        long = report['modes']['long']
+        assert long['output_characters'] == len(translitcodec.long_encode(text)[0])
+        assert long['unmapped'] == [{'code_point': 'U+2603', 'char': '☃',
+                                     'name': 'SNOWMAN', 'count': 200}]
+        one = report['modes']['one']
+        assert [entry['char'] for entry in one['unmapped']] == ['☃', '£', '☹']
+
+    def test_ranges(self):
+        whole = coverage.analyze([self.dir], jobs=1)
+        range_size = coverage.RANGE_SIZE
+        coverage.RANGE_SIZE = 7
+        try:
+            assert coverage.analyze([self.dir], jobs=2) == whole
+        finally:
+            coverage.RANGE_SIZE = range_size
+
+    def test_utf16(self):
+        # The UTF-16 of Ċ holds a newline byte.
+        text = 'Ċ\n£ ☃\n' * 50
+        path = os.path.join(self.dir, 'c.txt')
+        with open(path, 'w', encoding='utf-16') as fh:
+            fh.write(text)
+        block_size = coverage.BLOCK_SIZE
+        coverage.BLOCK_SIZE = 7
+        try:
+            report = coverage.analyze([path], jobs=1, encoding='utf-16')
+        finally:
+            coverage.BLOCK_SIZE = block_size
+        assert report['characters'] == len(text)
+        assert report['modes']['long']['unmapped'] == [
+            {'code_point': 'U+2603', 'char': '☃', 'name': 'SNOWMAN',
+             'count': 50}]
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            coverage.make_report({}, 0, modes=['medium'])
+        with self.assertRaises(ValueError):
+            coverage.analyze([self.dir], jobs=1, modes=['medium'])
+
+    def test_combining_across_blocks(self):
+        text = unicodedata.normalize('NFD', 'é') * 50
+        path = os.path.join(self.dir, 'd.txt')
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write(text)
+        block_size = coverage.BLOCK_SIZE
+        coverage.BLOCK_SIZE = 4
+        try:
+            report = coverage.analyze([path], jobs=1)
+        finally:
+            coverage.BLOCK_SIZE = block_size
+        assert report['characters'] == 100
+        assert report['normalized_characters'] == 50
+        long = report['modes']['long']
+        assert long['unmapped'] == []
+        assert long['expansion_ratio'] == 0.5
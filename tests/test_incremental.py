@@ -0,0 +1,71 @@
+"""Tests for the incrementally updated shadow copy.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import random
+from unittest import TestCase
+
+import translitcodec
+from translitcodec import incremental
+from translitcodec.incremental import ShadowDocument
+
+
+class ShadowDocumentTests(TestCase):
+    chars = list('abc é£☹øåŁẓ̇́ﬁ½ßÆ\n') + [
+        'ᄀ', 'ᅡ', 'ᆨ', '가', 'ﾞ', '另',
+        '\U0001d400', '\U0001d165']
+
+    def setUp(self):
+        self.block_size = incremental.BLOCK_SIZE
+        incremental.BLOCK_SIZE = 16
+
+    def tearDown(self):
+        incremental.BLOCK_SIZE = self.block_size
+
+    def check(self, doc, text, mode):
+        output, offsets = translitcodec.transliterate_with_offsets(text, mode)
+        assert doc.text == text
+        assert len(doc) == len(text)
+        assert doc.output == output
+        assert doc.offsets == offsets
+        assert [doc.source_index(i) for i in range(len(output) + 1)] == list(
+            offsets)
+
+    def test_random_edits(self):
+        rnd = random.Random(0)
+        for mode in ('long', 'one'):
+            for _ in range(20):
+                text = ''.join(rnd.choice(self.chars)
+                               for _ in range(rnd.randint(0, 80)))
+                doc = ShadowDocument(text, mode)
+                for _ in range(20):
+                    start = rnd.randint(0, len(text))
+                    end = min(len(text), start + rnd.choice([0, 1, 3, 20]))
+                    replacement = ''.join(rnd.choice(self.chars) for _ in range(
+                        rnd.choice([0, 1, 2, 30])))
+                    text = text[:start] + replacement + text[end:]
+                    doc.edit(start, end, replacement)
+                    self.check(doc, text, mode)
+
+    def test_combining_mark_joins_previous_block(self):
+        text = 'o' * 16 + 'x' * 16
+        doc = ShadowDocument(text)
+        doc.edit(16, 16, '́')
+        self.check(doc, 'o' * 16 + '́' + 'x' * 16, 'long')
+        assert doc.output == 'o' * 16 + 'x' * 16
+
+    def test_delete_everything(self):
+        doc = ShadowDocument('Zażółć ' * 10)
+        doc.edit(0, len(doc), '')
+        self.check(doc, '', 'long')
+        doc.edit(0, 0, '£')
+        self.check(doc, '£', 'long')
+
+    def test_out_of_bounds(self):
+        doc = ShadowDocument('abc')
+        with self.assertRaises(ValueError):
+            doc.edit(2, 4, 'x')
+        with self.assertRaises(ValueError):
+            ShadowDocument('abc', 'medium')
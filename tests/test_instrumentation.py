@@ -0,0 +1,65 @@
+"""Tests for the instrumentation hooks.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import codecs
+from unittest import TestCase
+
+import translitcodec
+from translitcodec import instrumentation
+
+
+class HookTests(TestCase):
+    def test_events(self):
+        events = []
+        instrumentation.add_hook(events.append)
+        self.addCleanup(instrumentation.remove_hook, events.append)
+        codecs.encode('wøóf', 'translit/short')
+        codecs.encode('€', 'ascii', 'ignore/translit/long')
+        assert [(e.function, e.mode, e.input_length, e.output)
+                for e in events] == [('short_encode', 'short', 4, 'woof'),
+                                     ('ignore/translit/long', 'long', 1, 'EUR')]
+        assert all(e.normalize_seconds >= 0 and e.translate_seconds >= 0
+                   for e in events)
+
+    def test_rules_and_locales(self):
+        events = []
+        instrumentation.add_hook(events.append)
+        self.addCleanup(instrumentation.remove_hook, events.append)
+        codecs.encode('Цюрих', 'translit/gost')
+        codecs.encode('Αθήνα', 'translit/elot/ascii')
+        codecs.encode('Smörgås', 'translit/long@sv')
+        assert [(e.function, e.mode, e.input_length, e.output)
+                for e in events] == [
+                    ('RuleSet.encode', 'gost', 5, 'Cyurix'),
+                    ('RuleSet.encode', 'elot', 5, 'Athina'),
+                    ('ComposedTable.encode', 'long@sv', 7, 'Smorgas')]
+
+    def test_no_hooks(self):
+        assert not translitcodec._observers
+
+
+class CollectorTests(TestCase):
+    def setUp(self):
+        self.collector = instrumentation.enable()
+        self.addCleanup(instrumentation.disable)
+
+    def test_render(self):
+        translitcodec.long_encode('wøóf')
+        translitcodec.long_encode('x' * 100)
+        text = instrumentation.render()
+        assert ('translitcodec_calls_total'
+                '{function="long_encode",mode="long",size="16"} 1') in text
+        assert ('translitcodec_input_characters_total'
+                '{function="long_encode",mode="long",size="256"} 100') in text
+        assert ('translitcodec_translate_seconds_count'
+                '{function="long_encode",mode="long",size="256"} 1') in text
+        assert '# TYPE translitcodec_normalize_seconds histogram' in text
+
+    def test_disable(self):
+        instrumentation.disable()
+        translitcodec.long_encode('wøóf')
+        assert instrumentation.render() == ''
+        assert 'long_encode' not in self.collector.render()
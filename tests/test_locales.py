@@ -0,0 +1,50 @@
+"""Tests for locale profiles.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import codecs
+import unicodedata
+from unittest import TestCase
+
+from translitcodec import long_table
+from translitcodec.locales import LOCALES, _deltas, locale_table
+
+
+class LocaleTests(TestCase):
+
+    def test_profiles(self):
+        for locale, text, expected in [
+                ('de', 'GROẞE Straße', 'GROSSE Strasse'),
+                ('sv', 'Smörgåsbord', 'Smorgasbord'),
+                ('fi', 'Hämeenlinna, Åland', 'Hameenlinna, Aland'),
+                ('da', 'Ærøskøbing', 'AEroeskoebing'),
+                ('nl', 'Zoë, reünie', 'Zoe, reunie'),
+                ('vi', 'Tiếng Việt, Đà Nẵng', 'Tieng Viet, Da Nang'),
+                ('tr', 'Gülşen Öztürk, İzmir', 'Gulsen Ozturk, Izmir')]:
+            assert codecs.encode(text, 'translit/long@' + locale) == expected
+            # Decomposed input is normalized first.
+            assert codecs.encode(unicodedata.normalize('NFD', text),
+                                 'translit/long@' + locale) == expected
+
+    def test_matches_correction_pass(self):
+        text = ''.join(map(chr, sorted(long_table))) + ' plain ascii'
+        for locale in LOCALES:
+            deltas = _deltas[locale]
+            normalized = unicodedata.normalize('NFKC', text + ''.join(deltas))
+            expected = ''.join(deltas.get(char, char.translate(long_table))
+                                for char in normalized)
+            assert codecs.encode(text + ''.join(deltas),
+                                 'translit/long@' + locale) == expected
+
+    def test_byte_encoding(self):
+        assert codecs.encode('Ærø', 'translit/long@da/ascii') == b'AEroe'
+        assert codecs.encode('Ærø', 'translit/long@da/utf-16-le') == (
+            'AEroe'.encode('utf-16-le'))
+
+    def test_unknown(self):
+        for name in ('translit/long@xx', 'translit/short@de',
+                     'translit/long/fold@de', 'translit/long@de/nonesuch'):
+            self.assertRaises(LookupError, codecs.lookup, name)
+        self.assertRaises(ValueError, locale_table, 'xx')
@@ -0,0 +1,71 @@
+"""Tests for the command line interface.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from translitcodec.__main__ import main
+
+
+class MainTests(TestCase):
+    data = '£ ☹ wøóf méåw\r\nZażółć 另\n'
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def test_plain_files(self):
+        with open(self.path('in.txt'), 'w', encoding='utf-8', newline='') as fh:
+            fh.write(self.data)
+        assert main([self.path('in.txt'), self.path('out.txt')]) == 0
+        with open(self.path('out.txt'), encoding='utf-8', newline='') as fh:
+            assert fh.read() == 'GBP :-( woof meaaw\r\nZazolc 另\n'
+
+    def test_compressed_files(self):
+        for module, suffix in ((gzip, '.gz'), (bz2, '.bz2'), (lzma, '.xz')):
+            with module.open(self.path('in' + suffix), 'wt', encoding='utf-8') as fh:
+                fh.write(self.data)
+            assert main([self.path('in' + suffix), self.path('out' + suffix),
+                         '--mode', 'short', '--target-encoding', 'ascii',
+                         '--errors', 'replace']) == 0
+            with module.open(self.path('out' + suffix), 'rb') as fh:
+                assert fh.read() == b'GBP :-( woof meaw\r\nZazolc ?\n'
+
+    def test_strict(self):
+        with open(self.path('in.txt'), 'w', encoding='utf-8') as fh:
+            fh.write(self.data)
+        assert main([self.path('in.txt'), self.path('out.txt'),
+                     '--target-encoding', 'ascii']) == 1
+
+    def test_unknown_encoding(self):
+        for option in ('--target-encoding', '--input-encoding'):
+            stderr = io.StringIO()
+            with self.assertRaises(SystemExit) as raised, \
+                    contextlib.redirect_stderr(stderr):
+                main(['-', '-', option, 'no-such-encoding'])
+            assert raised.exception.code == 2
+            assert 'unknown encoding: no-such-encoding' in stderr.getvalue()
+
+    def test_missing_files(self):
+        with open(self.path('in.txt'), 'w', encoding='utf-8') as fh:
+            fh.write(self.data)
+        for argv in ([self.path('missing.txt'), self.path('out.txt')],
+                     [self.path('in.txt'), self.path('missing/out.txt')]):
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                assert main(argv) == 1
+            assert 'No such file or directory' in stderr.getvalue()
+        assert not os.path.exists(self.path('out.txt'))
@@ -0,0 +1,50 @@
+"""Tests for transliteration with offset maps.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+from unittest import TestCase
+
+import translitcodec
+from translitcodec.offsets import transliterate_with_offsets
+
+
+class OffsetTests(TestCase):
+    texts = ['', 'plain ascii', 'Ærø £5', 'Zażółć gęślą jaźń ☺ 另',
+             'é x́ ǿ̣ ﬁ ½ ㎏', '́leading mark',
+             '각 ｶﾞ \U0001d400\U0001f600']
+
+    def test_output_matches_codec(self):
+        for text in self.texts:
+            for mode in ('long', 'short', 'one'):
+                output, offsets = transliterate_with_offsets(text, mode)
+                assert output == translitcodec._mode_encoder(mode)(text)[0]
+                assert offsets.typecode == 'I'
+                assert len(offsets) == len(output) + 1
+                assert offsets[-1] == len(text)
+
+    def test_groups_map_back(self):
+        for text in self.texts:
+            for mode in ('long', 'short', 'one'):
+                encode = translitcodec._mode_encoder(mode)
+                output, offsets = transliterate_with_offsets(text, mode)
+                assert list(offsets) == sorted(offsets)
+                start = 0
+                while start < len(output):
+                    end = start + 1
+                    while (end < len(output) and
+                           offsets[end] == offsets[start]):
+                        end += 1
+                    source = text[offsets[start]:offsets[end]]
+                    assert encode(source)[0] == output[start:end], (
+                        text, mode, start)
+                    start = end
+
+    def test_example(self):
+        text = 'Ærø £5'
+        output, offsets = transliterate_with_offsets(text)
+        assert output == 'AEro GBP5'
+        assert list(offsets) == [0, 0, 1, 2, 3, 4, 4, 4, 5, 6]
+        start = output.index('GBP')
+        assert text[offsets[start]:offsets[start + 3]] == '£'
@@ -0,0 +1,78 @@
+"""Tests for profile-guided table pruning.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import importlib.util
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import translitcodec
+from translitcodec import instrumentation
+from translitcodec.pruning import Profile, write_module
+
+
+class PruningTests(TestCase):
+    sample = 'Zażółć gęślą jaźń, Straße № 5'
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def load(self, profile):
+        path = os.path.join(self.dir, 'pruned_tables.py')
+        write_module(profile, path)
+        spec = importlib.util.spec_from_file_location('pruned_tables', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def test_feed(self):
+        profile = Profile()
+        profile.feed(self.sample)
+        assert profile.entries('long') == {
+            cp: translitcodec.long_table[cp] for cp in map(ord, 'żółćęśąźńß')}
+
+    def test_hook(self):
+        profile = Profile()
+        instrumentation.add_hook(profile.hook)
+        try:
+            translitcodec.short_encode('ż')
+        finally:
+            instrumentation.remove_hook(profile.hook)
+        assert profile.entries('short') == {ord('ż'): 'z'}
+        assert profile.entries('long') == {}
+
+    def test_module(self):
+        profile = Profile()
+        profile.feed(self.sample)
+        module = self.load(profile)
+        assert len(module.long_table) == 10
+        for mode, encode in (('long', translitcodec.long_encode),
+                             ('short', translitcodec.short_encode),
+                             ('one', translitcodec.single_encode)):
+            for text in (self.sample, '£ ☹ wøóf méåw ½'):
+                assert module.encoders[mode](text) == encode(text)
+
+    def test_search(self):
+        profile = Profile()
+        profile.feed(self.sample)
+        module = self.load(profile)
+        for name in ('translit/long/ascii', 'translit_long_ascii'):
+            info = module._search(name)
+            assert info.encode('Straße ½') == (b'Strasse 1/2', 8)
+        assert module._search('translit/short').encode('ż') == ('z', 1)
+        for name in ('translit/long/fold', 'translit/long@de', 'translit/x',
+                     'utf-8'):
+            assert module._search(name) is None
+
+    def test_misses_bounded(self):
+        module = self.load(Profile())
+        table = module.long_table
+        table.limit = len(table) + 2
+        text = 'ĀāĂăĄą'
+        assert module.encoders['long'](text) == translitcodec.long_encode(text)
+        assert len(table) == 2
@@ -0,0 +1,140 @@
+"""Tests for romanization with context rules.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import codecs
+from unittest import TestCase
+
+import translitcodec
+from translitcodec import long_encode
+from translitcodec.rules import RuleSet, elot_encode, gost_encode
+
+
+class GostTests(TestCase):
+
+    def test_letters(self):
+        assert gost_encode('Чехов')[0] == 'Chexov'
+        assert gost_encode('щука ёлка юла яма')[0] == 'shhuka yolka yula yama'
+        assert gost_encode('объём, мышь')[0] == "ob``yom, my'sh`"
+        assert gost_encode('Ґанок, Їжак, Џеп')[0] == 'G`anok, Yizhak, Dhep'
+
+    def test_context(self):
+        assert gost_encode('цирк цыган центр')[0] == "cirk cy'gan centr"
+        assert gost_encode('Цюрих')[0] == 'Cyurix'
+        assert gost_encode('цэ')[0] == 'ce`'
+        assert gost_encode('цё')[0] == 'cyo'
+        assert gost_encode('цяпа')[0] == 'cyapa'
+        assert gost_encode('цапля, отец')[0] == 'czaplya, otecz'
+        assert gost_encode('Цирк Цапля')[0] == 'Cirk Czaplya'
+
+    def test_capitals(self):
+        assert gost_encode('ЧЕХОВ')[0] == 'CHEXOV'
+        assert gost_encode('ЦУМ ЦИРК')[0] == 'CZUM CIRK'
+        assert gost_encode('Щ')[0] == 'Shh'
+        assert gost_encode('Щука ЩУКА')[0] == 'Shhuka SHHUKA'
+
+    def test_rest(self):
+        text = 'Łódź, ½ €'
+        assert gost_encode(text) == long_encode(text)
+        assert gost_encode(b'abc') == ('abc', 3)
+
+    def test_codec(self):
+        assert codecs.encode('Москва', 'translit/gost') == 'Moskva'
+        assert codecs.encode('Москва', 'translit/gost/ascii') == b'Moskva'
+
+
+class ElotTests(TestCase):
+
+    def test_letters(self):
+        assert elot_encode('Αθήνα')[0] == 'Athina'
+        assert elot_encode('ψυχή, Χανιά')[0] == 'psychi, Chania'
+        assert elot_encode('ΘΕΣΣΑΛΟΝΙΚΗ')[0] == 'THESSALONIKI'
+
+    def test_diphthongs(self):
+        assert elot_encode('αυτός ευχαριστώ')[0] == 'aftos efcharisto'
+        assert elot_encode('Ευρώπη αυλή παύω')[0] == 'Evropi avli pavo'
+        assert elot_encode('ουρανός Ουρανός ΟΥΡΑΝΟΣ')[0] == (
+            'ouranos Ouranos OURANOS')
+        assert elot_encode('ΑΥΤΟ')[0] == 'AFTO'
+
+    def test_consonants(self):
+        assert elot_encode('άγγελος έγχρωμος σφίγξ')[0] == (
+            'angelos enchromos sfinx')
+        assert elot_encode('μπάμπας Μπάμπας ΜΠΑΜΠΑΣ')[0] == (
+            'bambas Bambas BAMBAS')
+        assert elot_encode('λάμπα')[0] == 'lamba'
+
+    def test_codec(self):
+        assert codecs.encode('Ελλάδα', 'translit/elot') == 'Ellada'
+        assert codecs.encode('Ελλάδα', 'translit/elot/ascii') == b'Ellada'
+
+
+class RuleSetTests(TestCase):
+
+    def test_rules(self):
+        rules = RuleSet({'a': 'a', 'b': 'b'},
+                        [('a(?=b)', 'x'), ('b(?=a)', 'y'), ('a', 'z')])
+        assert rules.translate('abaa') == 'xyzz'
+        assert rules.translate('Ab AB') == 'Xb XB'
+        assert rules.translate('ä') == 'ae'
+        assert rules.encode('ab') == ('xb', 2)
+
+    def test_capitals(self):
+        rules = RuleSet({'þ': 'th', 'Þ': 'Th'})
+        assert rules.translate('Þor ÞOR') == 'Thor THOR'
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            RuleSet({}, [('(?<=a)b', 'c')])
+
+
+class HelperTests(TestCase):
+    texts = ['Москва', 'ЦУМ ½', 'ascii', 'Ευρώπη', 'a\x00b']
+
+    def test_batch(self):
+        for mode, encode in (('gost', gost_encode), ('elot', elot_encode)):
+            expected = [encode(text)[0] for text in self.texts]
+            assert list(translitcodec.iter_transliterate(
+                self.texts, mode)) == expected
+            assert list(translitcodec.iter_transliterate(
+                self.texts[:1], mode)) == expected[:1]
+            outputs, _ = translitcodec.transliterate_tokens(self.texts, mode)
+            assert outputs == expected
+            assert translitcodec.transliterate_column(
+                self.texts, mode) == expected
+            assert translitcodec.transliterate_variants_column(
+                self.texts, [mode]) == {mode: expected}
+
+    def test_scan(self):
+        for mode, encode in (('gost', gost_encode), ('elot', elot_encode)):
+            for text in self.texts:
+                output = encode(text)[0]
+                assert translitcodec.transliterated_length(
+                    text, mode) == len(output)
+                assert translitcodec.encoded_length(
+                    text, mode, 'utf-16-le') == 2 * len(output)
+                assert translitcodec.needs_transliteration(
+                    text, mode) == (output != text)
+
+    def test_per_character_helpers(self):
+        from translitcodec.incremental import ShadowDocument
+        from translitcodec.words import WordOverrides
+        calls = [
+            lambda text, mode: list(translitcodec.iter_spans(text, mode)),
+            lambda text, mode: translitcodec.transliterate_prefix(
+                text, 2, mode),
+            lambda text, mode: translitcodec.transliterate_with_offsets(
+                text, mode),
+            lambda text, mode: translitcodec.find_unmappable(text, mode),
+            lambda text, mode: ShadowDocument(text, mode),
+            lambda text, mode: WordOverrides({text: text}, mode),
+            lambda text, mode: translitcodec.compose(mode),
+        ]
+        for mode in ('gost', 'elot'):
+            for text in ('Щ', 'abc'):
+                for call in calls:
+                    with self.assertRaisesRegex(ValueError,
+                                                'no character table'):
+                        call(text, mode)
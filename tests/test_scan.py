@@ -0,0 +1,174 @@
+"""Tests for the single scan text queries.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import codecs
+import unicodedata
+from unittest import TestCase
+
+import translitcodec
+
+
+class FindUnmappableTests(TestCase):
+    texts = ['Zażółć gęślą jaźń € ☺另!@#',
+             'e\u0301 \u01ff \xf8\u0301 ﬁ ½ Ω √',
+             '\xf8\u0301\u0323x\u0301']
+
+    @staticmethod
+    def reference(text, mode, encoding):
+        """Positions where strict/translit/<mode> raises."""
+        positions = []
+        strict = codecs.lookup_error('strict/translit/' + mode)
+
+        def record(exc):
+            try:
+                return strict(exc)
+            except UnicodeEncodeError:
+                positions.append(exc.start)
+                return '', exc.start + 1
+        codecs.register_error('test/record', record)
+        text.encode(encoding, 'test/record')
+        return positions
+
+    def test_matches_error_handler(self):
+        for text in self.texts:
+            for mode in ('long', 'short', 'one'):
+                for encoding in ('ascii', 'latin-1', 'iso-8859-2', 'cp1258',
+                                 'gbk', 'utf-8'):
+                    assert translitcodec.find_unmappable(
+                        text, mode, encoding) == self.reference(
+                            text, mode, encoding), (text, mode, encoding)
+
+    def test_example(self):
+        assert translitcodec.find_unmappable('Łódź ☺ 另', 'long', 'latin-1') == [7]
+        assert translitcodec.find_unmappable('Łódź ☺ 另', 'one', 'ascii') == [5, 7]
+
+
+class SpanTests(TestCase):
+    texts = ['', 'plain ascii', 'Smörgåsbord, £5', 'Zażółć gęślą jaźń ☺',
+             'é x́ ǿ̣ ﬁ ½', '́leading mark',
+             '각 각 ｶﾞ',
+             '\U0001d400\U0001f600 \U0001d15f\U0001d165']
+
+    def test_spans_reproduce_transliteration(self):
+        for text in self.texts:
+            for mode in ('long', 'short', 'one'):
+                encode = translitcodec._mode_encoder(mode)
+                parts = []
+                position = 0
+                for start, end in translitcodec.iter_spans(text, mode):
+                    assert position <= start < end
+                    part = text[start:end]
+                    assert encode(part)[0] != part
+                    parts.append(text[position:start])
+                    parts.append(encode(part)[0])
+                    position = end
+                parts.append(text[position:])
+                assert ''.join(parts) == encode(text)[0], (text, mode)
+
+    def test_needs_transliteration(self):
+        for text in self.texts:
+            for mode in ('long', 'short', 'one'):
+                encode = translitcodec._mode_encoder(mode)
+                assert translitcodec.needs_transliteration(text, mode) == (
+                    encode(text)[0] != text), (text, mode)
+        assert not translitcodec.needs_transliteration('x́ 另')
+
+    def test_example(self):
+        assert list(translitcodec.iter_spans('Smörgåsbord, £5')) == [
+            (2, 3), (5, 6), (13, 14)]
+
+
+class LengthTests(TestCase):
+    texts = SpanTests.texts + ['Łódź ½ Straße', 'Æsir ﬁx 另\n']
+
+    def test_transliterated_length(self):
+        for text in self.texts:
+            for mode in ('long', 'short', 'one'):
+                encode = translitcodec._mode_encoder(mode)
+                assert translitcodec.transliterated_length(text, mode) == len(
+                    encode(text)[0]), (text, mode)
+
+    def test_encoded_length(self):
+        for text in self.texts:
+            for mode in ('long', 'one'):
+                encode = translitcodec._mode_encoder(mode)
+                for encoding in ('utf-8', 'utf-16', 'utf-8-sig', 'latin-1',
+                                 'gbk', 'iso2022_jp'):
+                    for errors in ('replace', 'ignore', 'xmlcharrefreplace',
+                                   'replace/translit/long'):
+                        assert translitcodec.encoded_length(
+                            text, mode, encoding, errors) == len(codecs.encode(
+                                encode(text)[0], encoding, errors)), (
+                                    text, mode, encoding, errors)
+
+    def test_encoded_length_strict(self):
+        assert translitcodec.encoded_length('Łódź ½', 'long', 'ascii') == 8
+        with self.assertRaises(UnicodeEncodeError):
+            translitcodec.encoded_length('Łódź 另', 'long', 'ascii')
+
+    def test_fold_modes(self):
+        for text in self.texts:
+            for mode in ('long', 'one'):
+                folded = translitcodec._mode_encoder(mode)(text)[0].casefold()
+                assert translitcodec.transliterated_length(
+                    text, mode + '/fold') == len(folded)
+                assert translitcodec.encoded_length(
+                    text, mode + '/fold', 'utf-8', 'replace') == len(
+                        folded.encode('utf-8', 'replace'))
+
+
+class PrefixTests(TestCase):
+
+    def test_prefix_of_full_transliteration(self):
+        text = 'Zażółć £5 Ærø ﬁx é x́ ½ ' * 20
+        for mode in ('long', 'short', 'one'):
+            full = translitcodec._mode_encoder(mode)(text)[0]
+            for limit in range(0, len(full) + 2, 7):
+                prefix = translitcodec.transliterate_prefix(text, limit, mode)
+                assert full.startswith(prefix), (mode, limit)
+                # No replacement in the text is longer than three.
+                assert len(prefix) <= limit, (mode, limit)
+                assert prefix == full or len(prefix) > limit - 3, (mode, limit)
+
+    def test_replacements_are_not_split(self):
+        assert translitcodec.transliterate_prefix('£5 Ærø', 2) == ''
+        assert translitcodec.transliterate_prefix('£5 Ærø', 4) == 'GBP5'
+        assert translitcodec.transliterate_prefix('£5 Ærø', 5) == 'GBP5 '
+        assert translitcodec.transliterate_prefix('£5 Ærø', 6) == 'GBP5 '
+        assert translitcodec.transliterate_prefix('£5 Ærø', 7) == 'GBP5 AE'
+        assert translitcodec.transliterate_prefix('ﬁx', 1) == ''
+
+
+class DecomposedTests(TestCase):
+    texts = ['Zażółć gęślą jaźń', 'Tiếng Việt ǅ ﬁ ½', '한국어 Ærø', 'ẹ́',
+             '̈x́\U0001d400́']
+
+    def test_sequence_table(self):
+        from translitcodec._sequences import sequence_table
+        sequences = sequence_table(translitcodec.long_table)
+        for segment in ('é', 'ﬁ', '́', 'ệ',
+                        'ệ', '각', 'x' * 20):
+            assert sequences[segment] == unicodedata.normalize(
+                'NFKC', segment).translate(translitcodec.long_table)
+
+    def test_helpers_on_decomposed_text(self):
+        for text in self.texts:
+            text = unicodedata.normalize('NFD', text)
+            for mode in ('long', 'one'):
+                full = translitcodec._mode_encoder(mode)(text)[0]
+                assert translitcodec.transliterated_length(
+                    text, mode) == len(full)
+                assert translitcodec.transliterate_with_offsets(
+                    text, mode)[0] == full
+                assert translitcodec.transliterate_prefix(
+                    text, 5, mode) == full[:len(
+                        translitcodec.transliterate_prefix(text, 5, mode))]
+                output = text
+                for start, end in reversed(list(
+                        translitcodec.iter_spans(text, mode))):
+                    output = (output[:start] + translitcodec._mode_encoder(
+                        mode)(text[start:end])[0] + output[end:])
+                assert output == full
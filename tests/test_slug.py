@@ -0,0 +1,44 @@
+"""Tests for slug generation.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import codecs
+import re
+from unittest import TestCase
+
+from translitcodec import slugify
+
+
+def three_passes(text, sep='-'):
+    text = codecs.encode(text, 'translit/long').lower()
+    return sep.join(re.sub('[^a-z0-9]+', ' ', text).split())
+
+
+class SlugifyTests(TestCase):
+    texts = ['Straße nach Łódź — 5 €', '', '  --  ', 'ΣΑΣ İstanbul ǅ ½',
+             'été ﬁn 另 K', 'Zażółć gęślą jaźń ' * 30]
+
+    def test_matches_three_passes(self):
+        for text in self.texts:
+            for sep in ('-', '_', '--'):
+                assert slugify(text, sep) == three_passes(text, sep), (
+                    text, sep)
+
+    def test_max_len(self):
+        assert slugify('Łódź, Kraków and Gdańsk', max_len=12) == 'lodz-krakow'
+        assert slugify('Łódź, Kraków and Gdańsk', max_len=10) == 'lodz'
+        assert slugify('Łódź, Kraków and Gdańsk', max_len=3) == 'lod'
+        assert slugify('Łódź, Kraków and Gdańsk', max_len=0) == ''
+        assert slugify('Łódź', max_len=100) == 'lodz'
+
+    def test_max_len_cuts_at_words(self):
+        for text in self.texts:
+            full = three_passes(text)
+            for max_len in range(0, len(full) + 2, 5):
+                slug = slugify(text, max_len=max_len)
+                assert len(slug) <= max_len
+                assert full.startswith(slug)
+                assert full[len(slug):len(slug) + 1] in ('', '-') or (
+                    '-' not in slug and len(slug) == max_len), (text, max_len)
@@ -0,0 +1,97 @@
+"""Tests for table composition.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import codecs
+import sys
+import unicodedata
+from unittest import TestCase
+
+from translitcodec import _mode_table, compose, long_table, tables
+
+
+def in_turn(text, *steps):
+    text = unicodedata.normalize('NFKC', text)
+    for step in steps:
+        text = text.translate(
+            _mode_table(step) if isinstance(step, str)
+            else str.maketrans(step))
+    return text
+
+
+class ComposeTests(TestCase):
+    texts = ['"Łódź" | 5 €', '', 'plain ascii', 'aä ﬁ ½ ß', 'ΣΑΣ ǅ',
+             'é \U0001d400 另']
+    quotes = {'"': None, "'": None, '|': '/'}
+    umlauts = {ord('ä'): 'ae', 'a': 'ä', 'E': 69, '/': '//'}
+
+    def test_matches_steps_in_turn(self):
+        for steps in [('long',), ('long', self.quotes),
+                      (self.umlauts, 'short'), ('one', self.umlauts),
+                      (self.quotes, self.umlauts, 'long/fold'),
+                      ('long', 'long/fold')]:
+            table = compose(*steps)
+            for text in self.texts:
+                assert table.translate(text) == in_turn(text, *steps), (
+                    steps, text)
+
+    def test_overrides(self):
+        table = compose('long', self.quotes, overrides={'€': 'euro', 'ł': 76})
+        assert table.translate('"Łódź" | 5 €') == 'Lodz / 5 euro'
+        assert table.translate('łódź') == 'Lodz'
+        assert compose('long', overrides={'Ł': None}).translate('Łódź') == (
+            'odz')
+
+    def test_cached_by_content(self):
+        table = compose('long', self.quotes)
+        assert compose('long', dict(self.quotes)) is table
+        assert compose('long', {'"': None, "'": None, '|': '|'}) is not table
+        assert compose(self.quotes, 'long') is not table
+        assert compose(table, 'short').fingerprint == compose(
+            table, 'short').fingerprint
+
+    def test_encode(self):
+        table = compose('long')
+        assert table.encode('Łódź') == ('Lodz', 4)
+        assert table.encode('Łódź') == codecs.lookup('translit/long').encode(
+            'Łódź')
+
+    def test_errors(self):
+        self.assertRaises(ValueError, compose, 'medium')
+        self.assertRaises(ValueError, compose, {'ab': 'c'})
+        self.assertRaises(TypeError, compose, {'a': 1.5})
+
+
+class CacheTests(TestCase):
+
+    def setUp(self):
+        self.cache_size = tables.CACHE_SIZE
+        tables.CACHE_SIZE = 3
+
+    def tearDown(self):
+        tables.CACHE_SIZE = self.cache_size
+
+    def test_least_recently_used_evicted(self):
+        first = compose('long', overrides={'ß': 's'})
+        second = compose('long', overrides={'ß': 'ss'})
+        compose('long', overrides={'ß': 'sz'})
+        assert compose('long', overrides={'ß': 's'}) is first
+        compose('long', overrides={'ß': 'B'})
+        cached = [info.fingerprint for info in tables.cache_info()]
+        assert len(cached) == 3
+        assert cached[1] == first.fingerprint
+        assert second.fingerprint not in cached
+        assert compose('long', overrides={'ß': 'ss'}) is not second
+
+    def test_variants_share_replacements(self):
+        variant = compose('long', overrides={'ß': 's'})
+        assert variant.table[ord('ß')] == 's'
+        assert all(variant.table[cp] is value for cp, value in long_table.items()
+                   if cp != ord('ß'))
+        info = tables.cache_info()[0]
+        assert info.fingerprint == variant.fingerprint
+        assert info.entries == len(variant.table)
+        assert 0 < info.size < sys.getsizeof(long_table) + sum(
+            map(sys.getsizeof, long_table.values()))
@@ -0,0 +1,73 @@
+"""Tests for unmapped character telemetry.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import codecs
+import collections
+import random
+from unittest import TestCase
+
+import translitcodec
+from translitcodec import telemetry
+
+
+class TelemetryTests(TestCase):
+    def setUp(self):
+        telemetry.reset()
+        telemetry.enable()
+        self.addCleanup(telemetry.reset)
+        self.addCleanup(telemetry.disable)
+
+    def test_encoders(self):
+        assert codecs.encode('☃ é ☃ 另', 'translit/long') == '☃ e ☃ 另'
+        translitcodec.short_encode('☃')
+        snapshot = telemetry.snapshot()
+        assert snapshot['long'] == [('☃', 2, 0), ('另', 1, 0)]
+        assert snapshot['short'] == [('☃', 1, 0)]
+
+    def test_fold_modes(self):
+        assert codecs.encode('ЖУК Ωμ é', 'translit/long/fold') == (
+            'жук ωμ e')
+        snapshot = telemetry.snapshot()
+        assert list(snapshot) == ['long/fold']
+        assert sorted(snapshot['long/fold']) == [
+            ('Ω', 1, 0), ('μ', 1, 0), ('Ж', 1, 0), ('К', 1, 0), ('У', 1, 0)]
+
+    def test_error_handlers(self):
+        codecs.encode('Zażółć ☺ 另', 'ISO-8859-2', 'replace/translit/one')
+        assert telemetry.snapshot() == {'one': [('☺', 1, 0), ('另', 1, 0)]}
+
+    def test_bulk(self):
+        list(translitcodec.iter_transliterate(['☃', 'a', '☃']))
+        assert telemetry.snapshot() == {'long': [('☃', 2, 0)]}
+
+    def test_disabled(self):
+        telemetry.disable()
+        assert not telemetry.is_enabled()
+        translitcodec.long_encode('☃')
+        assert telemetry.snapshot() == {}
+
+
+class SpaceSavingTests(TestCase):
+    def test_bounded(self):
+        counter = telemetry.SpaceSaving(2)
+        for item in 'aabcccd':
+            counter.add(item)
+        assert len(counter.counts) == 2
+        assert counter.most_common() == [('c', 4, 1), ('d', 3, 2)]
+
+    def test_guarantees(self):
+        rnd = random.Random(0)
+        stream = [int(rnd.paretovariate(1.2)) for _ in range(20000)]
+        counter = telemetry.SpaceSaving(32)
+        for item in stream:
+            counter.add(item)
+        true = collections.Counter(stream)
+        assert sum(counter.counts.values()) == len(stream)
+        for item, count, error in counter.most_common():
+            assert count - error <= true[item] <= count
+        for item, count in true.items():
+            if count > len(stream) / 32:
+                assert item in counter.counts
@@ -0,0 +1,78 @@
+"""Tests for word overrides.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import random
+import re
+import unicodedata
+from unittest import TestCase
+
+from translitcodec import _mode_table
+from translitcodec.words import WordOverrides
+
+
+def word_by_word(text, mapping, mode):
+    """Replace single word keys one word at a time."""
+    pieces = re.split(r'(\w+)', unicodedata.normalize('NFKC', text))
+    table = _mode_table(mode)
+    return ''.join(mapping.get(piece, piece.translate(table)) if i % 2
+                   else piece.translate(table)
+                   for i, piece in enumerate(pieces))
+
+
+class WordOverridesTests(TestCase):
+
+    def test_words(self):
+        overrides = WordOverrides({'Straße': 'Strasse', 'Gödel': 'Godel'})
+        assert overrides.transliterate('Gödel, Straße, Straßenbahn') == (
+            'Godel, Strasse, Strassenbahn')
+        assert overrides.transliterate('Gödels Gödel') == 'Goedels Godel'
+        assert overrides.transliterate('') == ''
+        assert overrides.encode('Gödel') == ('Godel', 5)
+
+    def test_matches_word_by_word(self):
+        rnd = random.Random(0)
+        vocabulary = ['Gödel', 'Straße', 'Łódź', 'ﬁsh', 'naïve', 'plain',
+                      'Ærø', '北京', 'été']
+        mapping = {'Gödel': 'Godel', 'Łódź': 'LODZ', 'plain': 'PLAIN',
+                   'fish': 'FISH', 'été': 'ete'}
+        for mode in ('long', 'one', 'long/fold'):
+            overrides = WordOverrides(mapping, mode)
+            for _ in range(200):
+                text = ''.join(rnd.choice(vocabulary) + rnd.choice(' ,.-\n')
+                               for _ in range(rnd.randint(0, 8)))
+                assert overrides.transliterate(text) == word_by_word(
+                    text, mapping, mode), (text, mode)
+
+    def test_phrases(self):
+        overrides = WordOverrides({'New York': 'NY', 'New York City': 'NYC',
+                                   "McDonald's": 'McDonalds'})
+        assert overrides.transliterate(
+            "New York City, New\n York, McDonald's, McDonald, New-York") == (
+                "NYC, NY, McDonalds, McDonald, New-York")
+        assert overrides.transliterate('New') == 'New'
+
+    def test_shared_first_word(self):
+        mapping = {'San %d Bay' % i: 'S%d' % i for i in range(1000)}
+        mapping.update({'San José': 'San Jose', 'San': 'St'})
+        overrides = WordOverrides(mapping)
+        assert overrides.transliterate('San 7 Bay, San José, San 7, San') == (
+            'S7, San Jose, St 7, St')
+
+    def test_case_insensitive(self):
+        overrides = WordOverrides({'gödel': 'godel', 'São Paulo': 'Sao Paulo',
+                                   'Straße': 'Strasse'}, case_sensitive=False)
+        assert overrides.transliterate('GÖDEL Gödel gödel') == (
+            'GODEL Godel godel')
+        assert overrides.transliterate('SÃO PAULO, são paulo') == (
+            'SAO PAULO, Sao Paulo')
+        assert overrides.transliterate('STRASSE') == 'STRASSE'
+        assert WordOverrides({'Gödel': 'Godel'}).transliterate('GÖDEL') == (
+            'GOeDEL')
+
+    def test_invalid_keys(self):
+        for key in ('', ' x', '#tag', 'x!'):
+            self.assertRaises(ValueError, WordOverrides, {key: 'y'})
+        self.assertRaises(ValueError, WordOverrides, {}, 'medium')
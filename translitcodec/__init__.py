@@ -10,13 +10,28 @@ the ``transtab`` collection by Markus Kuhn.
 
 """
 import codecs
+import collections
+import importlib
 import sys
+import time
 import unicodedata
 
+from translitcodec._unicode import backward_combining, casefold_changes
+
 
 __version_info__ = (0, 6, 0)
 __version__ = '.'.join(str(_) for _ in __version_info__)
 
+#: Callables given an :data:`_Event` for every transliteration, used by the
+#: optional monitoring in translitcodec.telemetry and
+#: translitcodec.instrumentation.  While empty, the encoders and error
+#: handlers skip monitoring entirely.
+_observers = []
+
+_Event = collections.namedtuple(
+    'Event', 'function mode table input_length normalized output '
+             'normalize_seconds translate_seconds')
+
 
 def long_encode(input, errors='strict'):
     """Transliterate to 8 bit using as many letters as needed.
@@ -28,6 +43,9 @@ def long_encode(input, errors='strict'):
     if not isinstance(input, str):
         input = str(input, sys.getdefaultencoding(), errors)
     length = len(input)
+    if _observers:
+        return _observed_transliterate(
+            'long_encode', 'long', input, long_table), length
     input = unicodedata.normalize('NFKC', input)
     return input.translate(long_table), length
 
@@ -42,6 +60,9 @@ def short_encode(input, errors='strict'):
     if not isinstance(input, str):
         input = str(input, sys.getdefaultencoding(), errors)
     length = len(input)
+    if _observers:
+        return _observed_transliterate(
+            'short_encode', 'short', input, short_table), length
     input = unicodedata.normalize('NFKC', input)
     return input.translate(short_table), length
 
@@ -56,21 +77,157 @@ def single_encode(input, errors='strict'):
     if not isinstance(input, str):
         input = str(input, sys.getdefaultencoding(), errors)
     length = len(input)
+    if _observers:
+        return _observed_transliterate(
+            'single_encode', 'one', input, single_table), length
     input = unicodedata.normalize('NFKC', input)
     return input.translate(single_table), length
 
 
+def long_fold_encode(input, errors='strict'):
+    """Transliterate like long_encode() and casefold, in one pass.
+
+    The result equals ``long_encode(input)[0].casefold()``, for use as a
+    search key.
+
+    """
+    if not isinstance(input, str):
+        input = str(input, sys.getdefaultencoding(), errors)
+    if not long_fold_table:
+        _load_fold_tables()
+    length = len(input)
+    if _observers:
+        return _observed_transliterate(
+            'long_fold_encode', 'long/fold', input, long_fold_table), length
+    input = unicodedata.normalize('NFKC', input)
+    return input.translate(long_fold_table), length
+
+
+def short_fold_encode(input, errors='strict'):
+    """Transliterate like short_encode() and casefold, in one pass."""
+    if not isinstance(input, str):
+        input = str(input, sys.getdefaultencoding(), errors)
+    if not short_fold_table:
+        _load_fold_tables()
+    length = len(input)
+    if _observers:
+        return _observed_transliterate(
+            'short_fold_encode', 'short/fold', input, short_fold_table), length
+    input = unicodedata.normalize('NFKC', input)
+    return input.translate(short_fold_table), length
+
+
+def single_fold_encode(input, errors='strict'):
+    """Transliterate like single_encode() and casefold, in one pass."""
+    if not isinstance(input, str):
+        input = str(input, sys.getdefaultencoding(), errors)
+    if not single_fold_table:
+        _load_fold_tables()
+    length = len(input)
+    if _observers:
+        return _observed_transliterate(
+            'single_fold_encode', 'one/fold', input, single_fold_table), length
+    input = unicodedata.normalize('NFKC', input)
+    return input.translate(single_fold_table), length
+
+
+def _observed_transliterate(function, mode, input, table, translate=None):
+    started = time.perf_counter()
+    normalized = unicodedata.normalize('NFKC', input)
+    normalized_at = time.perf_counter()
+    if translate is None:
+        output = normalized.translate(table)
+    else:
+        output = translate(normalized)
+    event = _Event(function, mode, table, len(input), normalized, output,
+                   normalized_at - started, time.perf_counter() - normalized_at)
+    for observer in _observers:
+        observer(event)
+    return output
+
+
+#: How many characters the error handlers remember per table.
+_HANDLER_CACHE_SIZE = 4096
+
+_handler_caches = {}
+
+# backward_combining(), loaded by the first error handler call.
+_backward = None
+
+
 def _error_handle_base(exc, table, unknown_char_cb):
     if isinstance(exc, UnicodeEncodeError):
-        char = unicodedata.normalize('NFKC', exc.object[exc.start:exc.end])[0]
-        new_char = char.translate(table)
+        if _observers:
+            return _observed_error_handle(exc, table, unknown_char_cb)
+        text, start = exc.object, exc.start
+        try:
+            cache = _handler_caches[id(table)]
+        except KeyError:
+            cache = _handler_caches[id(table)] = {}
+        result = cache.get(text[start])
+        if result is None or (
+                exc.end - start > 1 and
+                ord(text[start + 1]) in (_backward or _load_backward())):
+            result = _handler_translate(text, start, exc.end, table, cache)
+        char, new_char = result
         if char == new_char:
             new_char = unknown_char_cb(char, new_char, exc)
-        return new_char, exc.start + 1
+        return new_char, start + 1
     else:
         raise exc
 
 
+def _handler_translate(text, start, end, table, cache):
+    """Return the first unencodable character, normalized, and its
+    translation.
+
+    Unless the following character may combine with it, the result only
+    depends on the character itself and is remembered in *cache*.
+
+    """
+    if end - start > 1 and ord(text[start + 1]) in (_backward or
+                                                   _load_backward()):
+        char = unicodedata.normalize('NFKC', text[start:end])[0]
+        return char, char.translate(table)
+    if len(cache) >= _HANDLER_CACHE_SIZE:
+        cache.clear()
+    char = unicodedata.normalize('NFKC', text[start])[0]
+    result = cache[text[start]] = char, char.translate(table)
+    return result
+
+
+def _load_backward():
+    global _backward
+    _backward = backward_combining()
+    return _backward
+
+
+def _observed_error_handle(exc, table, unknown_char_cb):
+    started = time.perf_counter()
+    char = unicodedata.normalize('NFKC', exc.object[exc.start:exc.end])[0]
+    normalized_at = time.perf_counter()
+    new_char = char.translate(table)
+    mode = next(name for name, mode_table in _mode_tables.items()
+                if mode_table is table)
+    function = '%s/translit/%s' % (
+        _error_kinds.get(unknown_char_cb, 'error'), mode)
+    event = _Event(function, mode, table, 1, char, new_char,
+                   normalized_at - started, time.perf_counter() - normalized_at)
+    for observer in _observers:
+        observer(event)
+    if char == new_char:
+        new_char = unknown_char_cb(char, new_char, exc)
+    return new_char, exc.start + 1
+
+
+def _replace_unknown(c, n, e):
+    return '?'
+
+
+def _ignore_unknown(c, n, e):
+    return ''
+
+
 def replace_long(exc):
     """Error handler for transliterate to 8 bit using as many letters as needed.
 
@@ -79,7 +236,7 @@ def replace_long(exc):
 
     If the character is not replaced, then the '?' character is returned.
     """
-    return _error_handle_base(exc, long_table, lambda c, n, e: '?')
+    return _error_handle_base(exc, long_table, _replace_unknown)
 
 
 def replace_short(exc):
@@ -90,7 +247,7 @@ def replace_short(exc):
 
     If the character is not replaced, then the '?' character is returned.
     """
-    return _error_handle_base(exc, short_table, lambda c, n, e: '?')
+    return _error_handle_base(exc, short_table, _replace_unknown)
 
 
 def replace_single(exc):
@@ -101,7 +258,7 @@ def replace_single(exc):
 
     If the character is not replaced, then the '?' character is returned.
     """
-    return _error_handle_base(exc, single_table, lambda c, n, e: '?')
+    return _error_handle_base(exc, single_table, _replace_unknown)
 
 
 def ignore_long(exc):
@@ -112,7 +269,7 @@ def ignore_long(exc):
 
     If the character is not replaced, then it will be skipped.
     """
-    return _error_handle_base(exc, long_table, lambda c, n, e: '')
+    return _error_handle_base(exc, long_table, _ignore_unknown)
 
 
 def ignore_short(exc):
@@ -123,7 +280,7 @@ def ignore_short(exc):
 
     If the character is not replaced, then it will be skipped.
     """
-    return _error_handle_base(exc, short_table, lambda c, n, e: '')
+    return _error_handle_base(exc, short_table, _ignore_unknown)
 
 
 def ignore_single(exc):
@@ -134,13 +291,20 @@ def ignore_single(exc):
 
     If the character is not replaced, then it will be skipped.
     """
-    return _error_handle_base(exc, single_table, lambda c, n, e: '')
+    return _error_handle_base(exc, single_table, _ignore_unknown)
 
 
 def re_reaise(c, n, e):
     raise e
 
 
+_error_kinds = {
+    _replace_unknown: 'replace',
+    _ignore_unknown: 'ignore',
+    re_reaise: 'strict',
+}
+
+
 def strict_long(exc):
     """Error handler for transliterate to 8 bit using as many letters as needed.
 
@@ -178,6 +342,94 @@ def no_decode(input, errors='strict'):
     raise TypeError("transliterating codec does not support decode.")
 
 
+#: Encoders by codec mode name, as used in ``translit/<mode>``.
+_mode_encoders = {
+    'long': long_encode,
+    'short': short_encode,
+    'one': single_encode,
+    'long/fold': long_fold_encode,
+    'short/fold': short_fold_encode,
+    'one/fold': single_fold_encode,
+}
+
+
+#: Modes with context rules, whose encoders are added to _mode_encoders
+#: by _mode_encoder() when first looked up: see translitcodec.rules.
+_rule_modes = ('gost', 'elot')
+
+
+def _mode_encoder(mode):
+    try:
+        return _mode_encoders[mode]
+    except KeyError:
+        if mode not in _rule_modes:
+            raise ValueError('unknown transliteration mode %r' % (mode,))
+    from translitcodec import rules
+    return _mode_encoders.setdefault(mode, getattr(rules, mode + '_encode'))
+
+
+def _mode_table(mode):
+    try:
+        table = _mode_tables[mode]
+    except KeyError:
+        if mode in _mode_encoders or mode in _rule_modes:
+            # Such as gost, which has context rules: see translitcodec.rules.
+            raise ValueError('transliteration mode %r has no character table'
+                             % (mode,))
+        raise ValueError('unknown transliteration mode %r' % (mode,))
+    if not table:
+        _load_fold_tables()
+    return table
+
+
+def _load_fold_tables():
+    """Fill the /fold tables.
+
+    They follow the str.casefold() of the running interpreter, whose
+    Unicode version differs between Python releases, so they are built
+    on first use instead of being generated with the other tables.  Each
+    table is filled by a single update(), so other threads only ever see
+    it empty or complete.
+
+    """
+    cased = casefold_changes()
+    for folded, table in ((long_fold_table, long_table),
+                          (short_fold_table, short_table),
+                          (single_fold_table, single_table)):
+        if not folded:
+            folded.update(_fold_table(table, cased))
+
+
+def _fold_table(table, cased):
+    """Compose *table* with str.casefold().
+
+    Translating with the result gives the same as translating with
+    *table* and then casefolding, in a single pass.  *cased* holds the
+    code points which casefolding changes.
+
+    """
+    folded = {}
+    for cp in set(table).union(cased):
+        char = chr(cp)
+        new_char = table.get(cp, char).casefold()
+        if new_char != char:
+            folded[cp] = new_char
+    return _pad_ascii(folded)
+
+
+def _pad_ascii(table):
+    """Map every ASCII character *table* leaves alone to itself.
+
+    str.translate() raises and clears a KeyError inside for every
+    character missing from its table, which for mostly ASCII text costs
+    as much as the rest of the work.  Returns *table*, padded in place.
+
+    """
+    for cp in range(128):
+        table.setdefault(cp, chr(cp))
+    return table
+
+
 def _double_encoding_factory(encoder, byte_encoder, byte_encoding):
     """Send the transliterated output to another codec."""
     def dbl_encode(input, errors='strict'):
@@ -195,33 +447,102 @@ def trans_search(encoding):
     # translit/long/utf8
     # translit/one
     # translit/short/ascii
+    # translit/long/fold
+    # translit/long/fold/utf-8
+    # translit/long@de
+    # translit/long@de/ascii
 
     delim = '/'
     if sys.version_info > (3, 9):
         delim = '_'
 
     if encoding.startswith('translit' + delim):
-        parts = encoding.split(delim)
-        if parts[1] == 'long':
-            encoder = long_encode
-        elif parts[1] == 'short':
-            encoder = short_encode
-        elif parts[1] == 'one':
-            encoder = single_encode
+        from translitcodec.locales import LOCALES, locale_table
+        parts = encoding.split(delim)[1:]
+        mode, _, locale = parts.pop(0).partition('@')
+        if parts and parts[0] == 'fold':
+            mode += '/' + parts.pop(0)
+        # The @ of a locale is normalized to the delimiter too.
+        if not locale and parts and parts[0] in LOCALES:
+            locale = parts.pop(0)
+        if locale:
+            if mode != 'long' or locale not in LOCALES:
+                return None
+            encoder = locale_table(locale).encode
         else:
-            return None
-
-        if len(parts) == 2:
-            pass
-        elif len(parts) == 3:
-            byte_enc = parts[2]
-            byte_encoder = codecs.lookup(byte_enc).encode
+            try:
+                encoder = _mode_encoder(mode)
+            except ValueError:
+                return None
+
+        if parts:
+            # Codec names are normalized with the delimiter too, as in
+            # translit_long_utf_8.
+            byte_enc = delim.join(parts)
+            try:
+                byte_encoder = codecs.lookup(byte_enc).encode
+            except LookupError:
+                return None
             encoder = _double_encoding_factory(encoder, byte_encoder, byte_enc)
-        else:
-            return None
         return codecs.CodecInfo(encoder, no_decode)
     return None
 
+
+def register_error_handlers(encoding):
+    """Register error handlers with replacements precomputed for *encoding*.
+
+    The handlers behave like ``replace/translit/<mode>``,
+    ``ignore/translit/<mode>`` and ``strict/translit/<mode>``, but every
+    table character *encoding* cannot represent already has its
+    replacement looked up, so a failure costs a single dictionary hit.
+    They are registered as ``<errors>/translit/<mode>/<encoding>``, using
+    the canonical codec name for *encoding*, and the names are returned:
+
+      >>> translitcodec.register_error_handlers('cp1252')[0]
+      'replace/translit/long/cp1252'
+
+    """
+    encoding = codecs.lookup(encoding).name
+    names = []
+    for mode in ('long', 'short', 'one'):
+        table = _mode_tables[mode]
+        replacements = {}
+        for cp in table:
+            char = chr(cp)
+            try:
+                char.encode(encoding)
+                continue
+            except UnicodeEncodeError:
+                pass
+            normalized = unicodedata.normalize('NFKC', char)[0]
+            new_char = normalized.translate(table)
+            if new_char != normalized:
+                replacements[char] = new_char
+        for errors, unknown_char_cb in (('replace', _replace_unknown),
+                                        ('ignore', _ignore_unknown),
+                                        ('strict', re_reaise)):
+            name = '%s/translit/%s/%s' % (errors, mode, encoding)
+            codecs.register_error(name, _precomputed_error_handler(
+                table, replacements, unknown_char_cb))
+            names.append(name)
+    return names
+
+
+def _precomputed_error_handler(table, replacements, unknown_char_cb):
+    backward = _backward or _load_backward()
+
+    def handle(exc):
+        if isinstance(exc, UnicodeEncodeError) and not _observers:
+            text, start = exc.object, exc.start
+            new_char = replacements.get(text[start])
+            if new_char is not None and (
+                    exc.end - start == 1 or
+                    ord(text[start + 1]) not in backward):
+                return new_char, start + 1
+        return _error_handle_base(exc, table, unknown_char_cb)
+    return handle
+
+
 codecs.register(trans_search)
 
 codecs.register_error('replace/translit/long', replace_long)
@@ -2588,3 +2909,63 @@ single_table = {
 
 
 ### <
+
+# Filled by _load_fold_tables() on first use.
+long_fold_table = {}
+short_fold_table = {}
+single_fold_table = {}
+
+#: Translation tables by codec mode name.  Use _mode_table() to get one,
+#: as the /fold tables are empty until then.
+_mode_tables = {
+    'long': long_table,
+    'short': short_table,
+    'one': single_table,
+    'long/fold': long_fold_table,
+    'short/fold': short_fold_table,
+    'one/fold': single_fold_table,
+}
+
+#: Modes that change some ASCII characters.  ASCII text is left alone by
+#: all others, which lets the helper modules pass it through untouched.
+_ascii_changing_modes = {mode for mode, table in _mode_tables.items()
+                         if mode.endswith('/fold') or min(table) < 128}
+
+
+#: Helpers re-exported from the submodules, by the module holding each.
+#: They are imported on first use, which keeps the codec lookup cheap for
+#: programs that only use the codecs.
+_helper_modules = {
+    'iter_transliterate': 'bulk',
+    'transliterate_array': 'bulk',
+    'transliterate_column': 'bulk',
+    'transliterate_tokens': 'bulk',
+    'transliterate_variants': 'bulk',
+    'transliterate_variants_column': 'bulk',
+    'transliterate_with_offsets': 'offsets',
+    'encoded_length': 'scan',
+    'find_unmappable': 'scan',
+    'iter_spans': 'scan',
+    'needs_transliteration': 'scan',
+    'transliterate_prefix': 'scan',
+    'transliterated_length': 'scan',
+    'slugify': 'slug',
+    'compose': 'tables',
+    'elot_encode': 'rules',
+    'gost_encode': 'rules',
+}
+
+
+def __getattr__(name):
+    try:
+        module = _helper_modules[name]
+    except KeyError:
+        raise AttributeError('module %r has no attribute %r'
+                             % (__name__, name))
+    value = getattr(importlib.import_module('translitcodec.' + module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()).union(_helper_modules))
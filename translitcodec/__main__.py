@@ -0,0 +1,98 @@
+"""Command line transliteration: ``python -m translitcodec``.
+
+Reads text from a file or stdin and writes the transliteration to a file
+or stdout.  Input compressed with gzip, bz2 or xz is detected and
+decompressed automatically; output is compressed when the output file
+name ends in ``.gz``, ``.bz2`` or ``.xz``.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import argparse
+import codecs
+import io
+import sys
+import time
+
+import translitcodec
+from translitcodec._compression import open_input, open_output
+
+
+def _encoding(name):
+    try:
+        codecs.lookup(name)
+    except LookupError:
+        raise argparse.ArgumentTypeError('unknown encoding: %s' % name)
+    return name
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m translitcodec',
+        description='Transliterate text to a smaller character set.')
+    parser.add_argument('input', nargs='?', default='-',
+                        help='input file, or - for stdin (default)')
+    parser.add_argument('output', nargs='?', default='-',
+                        help='output file, or - for stdout (default)')
+    parser.add_argument('-m', '--mode', choices=('long', 'short', 'one'),
+                        default='long', help='transliteration mode')
+    parser.add_argument('-t', '--target-encoding', default='utf-8',
+                        type=_encoding,
+                        help='encoding of the output (default: utf-8)')
+    parser.add_argument('-e', '--errors',
+                        choices=('strict', 'replace', 'ignore'),
+                        default='strict',
+                        help='what to do with characters the target '
+                             'encoding cannot represent, using the '
+                             '<errors>/translit/<mode> error handlers')
+    parser.add_argument('--input-encoding', default='utf-8',
+                        type=_encoding,
+                        help='encoding of the input (default: utf-8)')
+    parser.add_argument('--stats', action='store_true',
+                        help='report throughput on stderr')
+    return parser
+
+
+def main(argv=None):
+    options = _parser().parse_args(argv)
+    errors = '%s/translit/%s' % (options.errors, options.mode)
+    started = time.perf_counter()
+    written = lines = 0
+
+    target = None
+    try:
+        source = io.TextIOWrapper(open_input(options.input),
+                                  encoding=options.input_encoding, newline='')
+        with source:
+            target = io.TextIOWrapper(open_output(options.output),
+                                      encoding=options.target_encoding,
+                                      errors=errors, newline='')
+            for line in translitcodec.iter_transliterate(
+                    source, options.mode, batch_size=4096):
+                target.write(line)
+                lines += 1
+                written += len(line)
+        target.flush()
+    except (OSError, UnicodeError) as exc:
+        sys.stderr.write('%s\n' % exc)
+        return 1
+    finally:
+        if target is not None:
+            if options.output == '-':
+                target.detach()
+            else:
+                target.close()
+
+    if options.stats:
+        elapsed = time.perf_counter() - started
+        sys.stderr.write(
+            '%d lines, %d characters written in %.3f s '
+            '(%.1f k lines/s, %.2f M characters/s)\n' % (
+                lines, written, elapsed, lines / elapsed / 1e3,
+                written / elapsed / 1e6))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Transparent opening of gzip, bz2 and xz compressed files.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import bz2
+import functools
+import gzip
+import lzma
+import sys
+
+
+BUFFER_SIZE = 1 << 20
+
+_input_formats = (
+    (b'\x1f\x8b', gzip),
+    (b'BZh', bz2),
+    (b'\xfd7zXZ\x00', lzma),
+)
+
+# gzip defaults to level 9, several times slower than the level 6 used by
+# the gzip command line tool for little gain on text.
+_output_formats = {
+    '.gz': functools.partial(gzip.open, compresslevel=6),
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+
+def is_compressed(path):
+    """Whether the file at *path* starts with a known compression header."""
+    with open(path, 'rb') as fh:
+        head = fh.read(6)
+    return any(head.startswith(magic) for magic, _ in _input_formats)
+
+
+def open_input(path):
+    """Open *path*, or stdin for ``-``, for binary reading, decompressing
+    if needed."""
+    if path == '-':
+        stream = sys.stdin.buffer
+    else:
+        stream = open(path, 'rb', buffering=BUFFER_SIZE)
+    head = stream.peek(6)
+    for magic, module in _input_formats:
+        if head.startswith(magic):
+            if path == '-':
+                return module.open(stream, 'rb')
+            stream.close()
+            return module.open(path, 'rb')
+    return stream
+
+
+def open_output(path):
+    """Open *path*, or stdout for ``-``, for binary writing, compressing by
+    file name suffix."""
+    if path == '-':
+        return sys.stdout.buffer
+    for suffix, opener in _output_formats.items():
+        if path.endswith(suffix):
+            return opener(path, 'wb')
+    return open(path, 'wb', buffering=BUFFER_SIZE)
@@ -0,0 +1,83 @@
+"""Transliteration of multi code point sequences without normalizing.
+
+The helpers transliterate text one normalization segment at a time: a
+character and the combining characters after it, as found by the
+patterns built from :mod:`translitcodec._unicode`.  Text in NFD, or with
+combining marks typed on their own, is made of such segments, and
+normalizing each of them is most of the work.  A sequence table maps
+segments straight to their transliteration instead.  Since the segment
+boundaries are already known, a single dict lookup of the whole segment
+does what a trie walk over its code points would.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import unicodedata
+
+from translitcodec._unicode import _code_points, backward_combining, nfkc_unstable
+
+
+# Segments looked up beyond the precomputed ones that are remembered,
+# and the longest one that is.
+_MISSES_SIZE = 4096
+_MISS_LENGTH = 8
+
+_forms = None
+
+# Per table.
+_sequence_tables = {}
+
+
+class _SequenceTable(dict):
+    """Transliterations of segments with one table.
+
+    It holds the canonical decompositions of the precomposed characters
+    and the characters NFKC changes on their own, such as ligatures;
+    other segments are normalized and remembered when looked up.
+
+    """
+
+    def __init__(self, table):
+        dict.__init__(self, ((sequence, form.translate(table))
+                             for sequence, form in _load_forms().items()))
+        self.table = table
+        self.limit = len(self) + _MISSES_SIZE
+
+    def __missing__(self, segment):
+        value = unicodedata.normalize('NFKC', segment).translate(self.table)
+        if len(segment) <= _MISS_LENGTH and len(self) < self.limit:
+            self[segment] = value
+        return value
+
+
+def sequence_table(table):
+    """Return the :class:`_SequenceTable` of *table*.
+
+    ``sequence_table(table)[segment]`` equals
+    ``unicodedata.normalize('NFKC', segment).translate(table)`` for any
+    text cut at normalization boundaries.
+
+    """
+    sequences = _sequence_tables.get(id(table))
+    if sequences is None:
+        sequences = _sequence_tables[id(table)] = _SequenceTable(table)
+    return sequences
+
+
+def _load_forms():
+    """Map the sequences to their NFKC forms."""
+    global _forms
+    if _forms is None:
+        backward = backward_combining()
+        forms = {chr(cp): unicodedata.normalize('NFKC', chr(cp))
+                 for cp in nfkc_unstable()}
+        for cp in _code_points():
+            char = chr(cp)
+            if not unicodedata.decomposition(char):
+                continue
+            sequence = unicodedata.normalize('NFD', char)
+            if sequence != char and ord(sequence[0]) not in backward:
+                forms[sequence] = unicodedata.normalize('NFKC', char)
+        _forms = forms
+    return _forms
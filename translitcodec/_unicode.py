@@ -0,0 +1,126 @@
+"""Unicode normalization data used by the fast paths.
+
+NFKC normalization of a string equals the concatenation of the NFKC
+normalizations of its pieces when the string is cut only before
+characters that never interact with what precedes them.  The fast paths
+use the sets below to find such cut points, and to find the characters
+which ``unicodedata.normalize`` would change on their own.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import unicodedata
+
+
+# Code point ranges that hold no decomposable or combining characters
+# (CJK ideographs, Hangul syllables, surrogates, private use and the
+# unassigned planes) and are skipped when scanning the database.
+_SKIP = (
+    (0x3400, 0x4DC0),
+    (0x4E00, 0xA000),
+    (0xAC00, 0xD7A4),
+    (0xD800, 0xF900),
+    (0x20000, 0x2F800),
+    (0x2FA20, 0xE0000),
+    (0xE1000, 0x110000),
+)
+
+# Conjoining jamo which compose algorithmically with a preceding syllable.
+_JAMO_SECONDS = set(range(0x1161, 0x1176)) | set(range(0x11A8, 0x11C3))
+
+_data = None
+
+_casefold_changes = None
+
+
+def _code_points():
+    start = 0
+    for skip_start, skip_end in _SKIP:
+        yield from range(start, skip_start)
+        start = skip_end
+
+
+def _scan():
+    seconds = set(_JAMO_SECONDS)
+    decomposable = []
+    combining = set()
+    for cp in _code_points():
+        char = chr(cp)
+        if unicodedata.combining(char):
+            combining.add(cp)
+        decomposition = unicodedata.decomposition(char)
+        if decomposition:
+            decomposable.append(char)
+            parts = decomposition.split()
+            if len(parts) == 2 and not decomposition.startswith('<'):
+                seconds.add(int(parts[1], 16))
+    backward = combining | seconds
+    unstable = set()
+    for char in decomposable:
+        if ord(unicodedata.normalize('NFKD', char)[0]) in backward:
+            backward.add(ord(char))
+        if not unicodedata.is_normalized('NFKC', char):
+            unstable.add(ord(char))
+    return frozenset(backward), frozenset(unstable)
+
+
+def _get_data():
+    global _data
+    if _data is None:
+        _data = _scan()
+    return _data
+
+
+def backward_combining():
+    """Code points that may combine with or reorder around a predecessor.
+
+    A string may be cut before any character *not* in this set without
+    changing its NFKC normalization.
+
+    """
+    return _get_data()[0]
+
+
+def nfkc_unstable():
+    """Code points that NFKC normalization changes on their own."""
+    return _get_data()[1]
+
+
+def casefold_changes():
+    """Return the code points which str.casefold() changes.
+
+    Only the ranges outside _SKIP are scanned, which hold no cased
+    characters either.
+
+    """
+    global _casefold_changes
+    if _casefold_changes is None:
+        code_points = list(_code_points())
+        text = ''.join(map(chr, code_points))
+        changes = []
+        # Most blocks hold no cased character at all.
+        for start in range(0, len(text), 256):
+            block = text[start:start + 256]
+            if block.casefold() != block:
+                changes.extend(cp for cp in code_points[start:start + 256]
+                               if chr(cp).casefold() != chr(cp))
+        _casefold_changes = changes
+    return _casefold_changes
+
+
+def char_class(code_points):
+    """Return a regular expression character class for *code_points*."""
+    ranges = []
+    for cp in sorted(code_points):
+        if ranges and ranges[-1][1] == cp - 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    parts = []
+    for first, last in ranges:
+        if first == last:
+            parts.append('\\U%08x' % first)
+        else:
+            parts.append('\\U%08x-\\U%08x' % (first, last))
+    return '[%s]' % ''.join(parts)
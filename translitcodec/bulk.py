@@ -0,0 +1,288 @@
+"""Transliteration of many strings at once.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import itertools
+import sys
+import unicodedata
+from array import array
+
+from translitcodec import (
+    _ascii_changing_modes,
+    _mode_encoder,
+    _mode_table,
+    _mode_tables,
+    _observed_transliterate,
+    _observers,
+    _pad_ascii,
+    single_encode,
+    single_table,
+)
+from translitcodec._unicode import backward_combining, nfkc_unstable
+
+
+# Joins strings that are transliterated together.  NUL is a normalization
+# boundary that no table maps, so the joined result splits back cleanly.
+_SEPARATOR = '\x00'
+
+# Vectorized ``translit/one`` covers the Basic Multilingual Plane; rows
+# holding anything above it take the single_encode() path.
+_BMP_SIZE = 0x10000
+
+_single_arrays = None
+
+# Copies of the tables padded by _pad_ascii(), by id of the table.
+_translate_tables = {}
+
+# The modes of transliterate_variants() resolved, by modes.
+_variant_plans = {}
+
+
+def transliterate_column(values, mode='long'):
+    """Transliterate a column of strings.
+
+    Columns usually hold far fewer distinct values than rows, so each
+    distinct value is transliterated only once and the results are
+    scattered back by index.  ``None`` entries are passed through.
+
+    *values* may be any sequence of strings, in which case a list is
+    returned, or a NumPy ``str`` or ``object`` array, in which case an
+    array of the same shape is returned.
+
+    """
+    encode = _mode_encoder(mode)
+    numpy = _numpy_for(values)
+    if numpy is not None:
+        return _transliterate_array_column(numpy, values, mode)
+    seen = dict.fromkeys(values)
+    for value in seen:
+        if value is not None:
+            seen[value] = encode(value)[0]
+    return [seen[value] for value in values]
+
+
+def _numpy_for(values):
+    """Return the numpy module if *values* is a NumPy array.
+
+    NumPy is never imported here: the caller already has, if it passes
+    an array, and importing it unprompted would slow down every import
+    of translitcodec.
+
+    """
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        return numpy
+    return None
+
+
+def _transliterate_array_column(numpy, values, mode):
+    flat = values.ravel()
+    if flat.dtype.kind == 'U':
+        encode = _mode_encoder(mode)
+        uniques, inverse = numpy.unique(flat, return_inverse=True)
+        results = numpy.array([encode(value)[0] for value in uniques.tolist()],
+                              dtype=str)
+        if not len(results):
+            return values.copy()
+        return results[inverse.ravel()].reshape(values.shape)
+    result = numpy.empty(flat.shape, dtype=object)
+    result[:] = transliterate_column(flat.tolist(), mode)
+    return result.reshape(values.shape)
+
+
+def iter_transliterate(lines, mode='long', batch_size=1024):
+    """Lazily transliterate an iterable of strings, one result per item.
+
+    Items are grouped into batches of *batch_size* which are normalized
+    and translated in a single call each, so at most one batch is held in
+    memory at a time.  The results equal those of the mode's encoder
+    applied to each item.
+
+    """
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= batch_size:
+            yield from _translate_joined(batch, mode)
+            batch = []
+    if batch:
+        yield from _translate_joined(batch, mode)
+
+
+def transliterate_tokens(tokens, mode='long'):
+    """Transliterate a list of tokens, keeping the token boundaries.
+
+    ASCII tokens are passed through, except with the ``/fold`` modes; the
+    distinct other tokens are normalized and translated in a single pass.  Returns
+    ``(outputs, boundaries)``: the transliterated tokens, and an
+    ``array('I')`` of where each of them starts in ``''.join(outputs)``,
+    followed by the length of the whole:
+
+      >>> transliterate_tokens(['Straße', 'für', '£5'])
+      (['Strasse', 'fuer', 'GBP5'], array('I', [0, 7, 11, 15]))
+
+    """
+    tokens = list(tokens)
+    if mode in _ascii_changing_modes:
+        pending = list(dict.fromkeys(tokens))
+    else:
+        pending = list(dict.fromkeys(
+            token for token in tokens if not token.isascii()))
+    if pending:
+        done = dict(zip(pending, _translate_joined(
+            pending, mode, 'transliterate_tokens')))
+        outputs = [done.get(token, token) for token in tokens]
+    else:
+        _mode_encoder(mode)
+        outputs = tokens
+    boundaries = array('I', [0])
+    boundaries.extend(itertools.accumulate(map(len, outputs)))
+    return outputs, boundaries
+
+
+def transliterate_variants(text, modes=('long', 'short', 'one')):
+    """Transliterate *text* with each of *modes*, normalizing it once.
+
+    Returns a dict of the results by mode, equal to those of the modes'
+    encoders:
+
+      >>> transliterate_variants('£ Straße')
+      {'long': 'GBP Strasse', 'short': 'GBP Strasse', 'one': '£ Strase'}
+
+    """
+    modes, steps, ascii_changing = _variant_plan(modes)
+    if _observers:
+        return {mode: encode(text)[0] for mode, _, encode in steps}
+    if not ascii_changing and text.isascii():
+        return dict.fromkeys(modes, text)
+    text = unicodedata.normalize('NFKC', text)
+    return {mode: encode(text)[0] if table is None else text.translate(table)
+            for mode, table, encode in steps}
+
+
+def transliterate_variants_column(values, modes=('long', 'short', 'one')):
+    """Transliterate a column of strings with each of *modes*.
+
+    Returns a dict of lists by mode, each like transliterate_column()
+    gives for the mode.  The distinct values are normalized together
+    once, then translated with each mode's table.
+
+    """
+    modes, steps, _ = _variant_plan(modes)
+    values = list(values)
+    pending = [value for value in dict.fromkeys(values) if value is not None]
+    joined = _SEPARATOR.join(pending)
+    if _observers or joined.count(_SEPARATOR) != len(pending) - 1:
+        results = [[encode(value)[0] for value in pending]
+                   for _, _, encode in steps]
+    else:
+        joined = unicodedata.normalize('NFKC', joined)
+        results = [[encode(value)[0] for value in joined.split(_SEPARATOR)]
+                   if table is None else
+                   joined.translate(table).split(_SEPARATOR)
+                   for _, table, encode in steps]
+    columns = {}
+    for mode, outputs in zip(modes, results):
+        done = dict(zip(pending, outputs))
+        done[None] = None
+        columns[mode] = [done[value] for value in values]
+    return columns
+
+
+def _variant_plan(modes):
+    """Return *modes* as a tuple, ``(mode, table, encoder)`` for each,
+    and whether any of them changes ASCII.
+
+    table is the one to translate normalized text with, or None for the
+    modes that only have an encoder.
+
+    """
+    modes = tuple(modes)
+    plan = _variant_plans.get(modes)
+    if plan is None:
+        steps = []
+        for mode in modes:
+            encode = _mode_encoder(mode)
+            table = _mode_table(mode) if mode in _mode_tables else None
+            steps.append((mode, None if table is None
+                          else _translate_table(table), encode))
+        # Modes without a table, such as gost, leave ASCII alone too.
+        plan = _variant_plans[modes] = (
+            modes, steps, not _ascii_changing_modes.isdisjoint(modes))
+    return plan
+
+
+def _translate_joined(values, mode, function='iter_transliterate'):
+    """Transliterate a list of strings with one normalize and translate."""
+    joined = _SEPARATOR.join(values)
+    if (mode not in _mode_tables or
+            joined.count(_SEPARATOR) != len(values) - 1):
+        encode = _mode_encoder(mode)
+        return [encode(value)[0] for value in values]
+    table = _mode_table(mode)
+    if _observers:
+        joined = _observed_transliterate(function, mode, joined, table)
+    else:
+        joined = unicodedata.normalize('NFKC', joined).translate(
+            _translate_table(table))
+    return joined.split(_SEPARATOR)
+
+
+def _translate_table(table):
+    fast = _translate_tables.get(id(table))
+    if fast is None:
+        fast = _translate_tables[id(table)] = _pad_ascii(dict(table))
+    return fast
+
+
+def transliterate_array(values):
+    """Transliterate a NumPy ``str`` array using the ``translit/one`` mode.
+
+    Every ``single_table`` replacement is exactly one character, so the
+    mode is applied to the whole array at once as a code point lookup.
+    Rows containing characters that NFKC normalization would change, or
+    which may combine with their neighbours, are transliterated with
+    single_encode() instead, so the result always equals single_encode()
+    applied to each element.
+
+    Without NumPy, or for anything but a ``str`` array, this falls back
+    to ``transliterate_column(values, 'one')``.
+
+    """
+    numpy = _numpy_for(values)
+    if numpy is None or values.dtype.kind != 'U':
+        return transliterate_column(values, 'one')
+    width = values.dtype.itemsize // 4
+    if not width or not values.size:
+        return values.copy()
+    lookup, unsafe = _get_single_arrays(numpy)
+    values = numpy.ascontiguousarray(values, dtype='U%d' % width)
+    codes = values.view(numpy.uint32).reshape(values.size, width)
+    result = lookup.take(numpy.minimum(codes, _BMP_SIZE - 1))
+    result = result.view('U%d' % width).reshape(values.size)
+    slow = numpy.flatnonzero(
+        unsafe.take(numpy.minimum(codes, _BMP_SIZE)).any(axis=1))
+    if len(slow):
+        replaced = [single_encode(value)[0]
+                    for value in values.reshape(values.size)[slow].tolist()]
+        longest = max(len(value) for value in replaced)
+        if longest > width:
+            result = result.astype('U%d' % longest)
+        result[slow] = replaced
+    return result.reshape(values.shape)
+
+
+def _get_single_arrays(numpy):
+    global _single_arrays
+    if _single_arrays is None:
+        lookup = numpy.arange(_BMP_SIZE, dtype=numpy.uint32)
+        for cp, char in single_table.items():
+            lookup[cp] = ord(char)
+        unsafe = numpy.zeros(_BMP_SIZE + 1, dtype=bool)
+        unsafe[[cp for cp in backward_combining() | nfkc_unstable()
+                if cp < _BMP_SIZE]] = True
+        unsafe[_BMP_SIZE] = True
+        _single_arrays = lookup, unsafe
+    return _single_arrays
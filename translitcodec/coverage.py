@@ -0,0 +1,240 @@
+"""Measure how well the transliteration tables cover a corpus.
+
+Files are cut into byte ranges at line boundaries and counted in parallel
+worker processes; compressed files are counted whole.  Each worker reads
+one block at a time and only keeps a count per distinct code point, so
+memory stays bounded however large the corpus.  The result is a JSON
+serializable report giving, per mode, the share of characters the table
+covers, the unmapped code points with their counts and names, and the
+ratio of output to input length.
+
+From the command line::
+
+  $ python -m translitcodec.coverage --jobs 8 --output report.json corpus/
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import argparse
+import codecs
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import unicodedata
+
+from translitcodec import _mode_table
+from translitcodec._unicode import backward_combining
+from translitcodec._compression import is_compressed, open_input
+
+
+#: Bytes of input decoded and counted at a time by each worker.
+BLOCK_SIZE = 4 << 20
+
+#: Files larger than this are split between workers.
+RANGE_SIZE = 64 << 20
+
+
+def analyze(paths, jobs=None, encoding='utf-8', errors='replace', top=None,
+            modes=('long', 'short', 'one')):
+    """Return a coverage report for the files and directories in *paths*.
+
+    *jobs* worker processes are used, by default one per CPU; with
+    ``jobs=1`` everything is counted in the calling process.  *top*
+    limits the number of unmapped code points listed per mode.
+
+    """
+    for mode in modes:
+        _mode_table(mode)
+    units = list(_work_units(_iter_files(paths), encoding))
+    characters = 0
+    counts = collections.Counter()
+    tasks = [(unit, encoding, errors) for unit in units]
+    if jobs == 1:
+        results = map(_count_unit, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(jobs)
+        results = pool.imap_unordered(_count_unit, tasks)
+    try:
+        for unit_characters, unit_counts in results:
+            characters += unit_characters
+            counts.update(unit_counts)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    report = make_report(counts, characters, top=top, modes=modes)
+    report['files'] = len({unit[0] for unit in units})
+    return report
+
+
+def make_report(counts, characters, top=None, modes=('long', 'short', 'one')):
+    """Build a report from a Counter of NFKC normalized characters.
+
+    *characters* is the length of the input before normalization.
+
+    """
+    normalized = sum(counts.values())
+    ascii_count = sum(count for char, count in counts.items()
+                      if char <= '\x7f')
+    report = {
+        'characters': characters,
+        'normalized_characters': normalized,
+        'ascii_characters': ascii_count,
+        'modes': {},
+    }
+    for mode in modes:
+        table = _mode_table(mode)
+        mapped = output = ascii_count
+        unmapped = []
+        for char, count in counts.items():
+            if char <= '\x7f':
+                continue
+            replacement = table.get(ord(char))
+            if replacement is None:
+                unmapped.append((char, count))
+                output += count
+            else:
+                mapped += count
+                output += count * len(replacement)
+        unmapped.sort(key=lambda pair: (-pair[1], pair[0]))
+        unmapped_total = sum(count for _, count in unmapped)
+        report['modes'][mode] = {
+            'mapped_characters': mapped - ascii_count,
+            'unmapped_characters': unmapped_total,
+            'coverage': _ratio(mapped, normalized),
+            'non_ascii_coverage': _ratio(mapped - ascii_count,
+                                         normalized - ascii_count),
+            'output_characters': output,
+            'expansion_ratio': _ratio(output, characters),
+            'unmapped': [
+                {'code_point': 'U+%04X' % ord(char), 'char': char,
+                 'name': unicodedata.name(char, ''), 'count': count}
+                for char, count in unmapped[:top]],
+        }
+    return report
+
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else 1.0
+
+
+def _iter_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def _work_units(files, encoding):
+    # Only files in encodings where a newline is the byte it is in ASCII,
+    # and no other character contains that byte, can be cut at lines
+    # without decoding them; wide encodings are counted whole.
+    splittable = '\n'.encode(encoding) == b'\n'
+    for path in files:
+        size = os.path.getsize(path)
+        if not splittable or size <= RANGE_SIZE or is_compressed(path):
+            yield path, 0, None
+            continue
+        for start in range(0, size, RANGE_SIZE):
+            yield path, start, min(start + RANGE_SIZE, size)
+
+
+def _count_unit(task):
+    (path, start, end), encoding, errors = task
+    characters = 0
+    counts = collections.Counter()
+    # Blocks may end inside a character, and in a wide encoding such as
+    # UTF-16 inside a code unit: the decoder keeps the partial bytes for
+    # the next block.
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    backward = backward_combining()
+    pending = ''
+    for block in itertools.chain(_read_blocks(path, start, end), [None]):
+        text = pending + decoder.decode(block or b'', final=block is None)
+        if block is not None:
+            # Normalization may join the last character not in *backward*
+            # and those after it with the start of the next block, so they
+            # wait for it.
+            cut = len(text) - 1
+            while cut > 0 and ord(text[cut]) in backward:
+                cut -= 1
+            text, pending = text[:cut], text[cut:]
+        characters += len(text)
+        counts.update(unicodedata.normalize('NFKC', text))
+    return characters, counts
+
+
+def _read_blocks(path, start, end):
+    """Yield the blocks of the byte range [start, end), or of the whole
+    file if *end* is None.
+
+    A range is read in blocks of whole lines, and a line belongs to the
+    range it starts in.
+
+    """
+    if end is None:
+        with open_input(path) as fh:
+            while True:
+                block = fh.read(BLOCK_SIZE)
+                if not block:
+                    return
+                yield block
+    with open(path, 'rb') as fh:
+        if start:
+            fh.seek(start - 1)
+            fh.readline()
+        position = fh.tell()
+        while position < end:
+            block = fh.read(min(BLOCK_SIZE, end - position))
+            if not block:
+                return
+            yield _complete_line(fh, block)
+            position = fh.tell()
+
+
+def _complete_line(fh, block):
+    if block.endswith(b'\n'):
+        return block
+    return block + fh.readline()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m translitcodec.coverage',
+        description='Report how well the transliteration tables cover '
+                    'a corpus.')
+    parser.add_argument('paths', nargs='+', metavar='path',
+                        help='files or directories to analyze')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--encoding', default='utf-8',
+                        help='encoding of the corpus (default: utf-8)')
+    parser.add_argument('--top', type=int, default=None,
+                        help='list at most this many unmapped code points '
+                             'per mode')
+    parser.add_argument('-o', '--output', default='-',
+                        help='where to write the JSON report (default: '
+                             'stdout)')
+    options = parser.parse_args(argv)
+    report = analyze(options.paths, jobs=options.jobs,
+                     encoding=options.encoding, top=options.top)
+    if options.output == '-':
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(options.output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""A transliterated shadow copy kept up to date edit by edit.
+
+A :class:`ShadowDocument` holds a text together with its transliteration
+and the offset map of transliterate_with_offsets().  Each edit only
+normalizes and translates the part of the text around it, so keeping the
+shadow copy current costs about the same for a short note as for a book:
+
+  >>> doc = ShadowDocument('Zazolc gesla jazn')
+  >>> doc.edit(2, 3, 'ż')
+  >>> doc.edit(0, 6, 'Smörgåsbord')
+  >>> doc.text, doc.output
+  ('Smörgåsbord gesla jazn', 'Smoergaasbord gesla jazn')
+  >>> doc.source_index(doc.output.index('gesla'))
+  12
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import collections
+from array import array
+
+from translitcodec import _mode_table
+from translitcodec._unicode import backward_combining
+from translitcodec.offsets import transliterate_with_offsets
+from translitcodec.scan import _boundary_after
+
+
+#: Characters of text held per block.  An edit transliterates the blocks
+#: it touches again, and finding them takes a step per block.
+BLOCK_SIZE = 1024
+
+_Block = collections.namedtuple('_Block', 'text output offsets')
+
+
+class ShadowDocument(object):
+    """A text and its transliteration with *mode*, updated by edit().
+
+    The text is kept in blocks which start at normalization boundaries,
+    each with its own output and offsets, so an edit never has to touch
+    the parts of the document it does not change.
+
+    """
+
+    def __init__(self, text='', mode='long'):
+        _mode_table(mode)
+        self.mode = mode
+        self._length = len(text)
+        self._blocks = self._split(text) or [self._block('')]
+
+    def edit(self, start, end, replacement):
+        """Replace ``text[start:end]`` with *replacement*."""
+        if not 0 <= start <= end <= self._length:
+            raise ValueError('edit range %d:%d out of bounds' % (start, end))
+        blocks = self._blocks
+        first = 0
+        first_start = 0
+        while (first < len(blocks) - 1 and
+               first_start + len(blocks[first].text) <= start):
+            first_start += len(blocks[first].text)
+            first += 1
+        last = first
+        last_end = first_start + len(blocks[first].text)
+        while last_end < end:
+            last += 1
+            last_end += len(blocks[last].text)
+        text = ''.join(block.text for block in blocks[first:last + 1])
+        text = (text[:start - first_start] + replacement +
+                text[len(text) - (last_end - end):])
+        # A combining character at the start joins the block before, and
+        # small blocks are merged with the next one.
+        backward = backward_combining()
+        while first and text and ord(text[0]) in backward:
+            first -= 1
+            text = blocks[first].text + text
+        if len(text) < BLOCK_SIZE // 2 and last + 1 < len(blocks):
+            last += 1
+            text += blocks[last].text
+        blocks[first:last + 1] = self._split(text)
+        if not blocks:
+            blocks.append(self._block(''))
+        self._length += len(replacement) - (end - start)
+
+    @property
+    def text(self):
+        return ''.join(block.text for block in self._blocks)
+
+    @property
+    def output(self):
+        return ''.join(block.output for block in self._blocks)
+
+    @property
+    def offsets(self):
+        """The offset map of the output, as transliterate_with_offsets()
+        returns it."""
+        offsets = array('I')
+        base = 0
+        for block in self._blocks:
+            block_offsets = block.offsets[:-1]
+            offsets.extend(map(base.__add__, block_offsets) if base
+                           else block_offsets)
+            base += len(block.text)
+        offsets.append(base)
+        return offsets
+
+    def source_index(self, output_index):
+        """Return the index in the text that ``output[output_index]``
+        came from."""
+        base = 0
+        for block in self._blocks:
+            if output_index < len(block.output):
+                return base + block.offsets[output_index]
+            output_index -= len(block.output)
+            base += len(block.text)
+        if output_index == 0:
+            return base
+        raise IndexError('output index out of range')
+
+    def __len__(self):
+        return self._length
+
+    def _split(self, text):
+        blocks = []
+        position = 0
+        backward = backward_combining()
+        while position < len(text):
+            end = _boundary_after(text, position + BLOCK_SIZE, backward)
+            blocks.append(self._block(text[position:end]))
+            position = end
+        return blocks
+
+    def _block(self, text):
+        return _Block(text, *transliterate_with_offsets(text, self.mode))
@@ -0,0 +1,172 @@
+"""Latency and throughput instrumentation.
+
+Hooks added with add_hook() are called with an :class:`Event` after every
+transliteration done by the encoders, the error handlers and
+iter_transliterate().  With no hooks installed the codecs skip timing
+altogether.
+
+enable() installs a :class:`HistogramCollector`, which aggregates calls,
+characters and normalization and translation time by function, mode and
+input size, and renders them in the Prometheus text exposition format:
+
+  >>> from translitcodec import instrumentation
+  >>> collector = instrumentation.enable()
+  >>> codecs.encode('wøóf', 'translit/long')
+  'woof'
+  >>> print(instrumentation.render())
+  # HELP translitcodec_calls_total Transliteration calls.
+  # TYPE translitcodec_calls_total counter
+  translitcodec_calls_total{function="long_encode",mode="long",size="16"} 1
+  ...
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import threading
+
+from translitcodec import _Event as Event, _observers
+
+
+#: Upper bounds of the input size buckets, in characters.
+SIZE_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+#: Upper bounds of the latency histogram buckets, in seconds.
+SECONDS_BUCKETS = (1e-6, 4e-6, 16e-6, 64e-6, 256e-6, 1e-3, 4e-3, 16e-3,
+                   64e-3, 256e-3, 1.0)
+
+_collector = None
+
+
+def add_hook(hook):
+    """Call *hook* with an :class:`Event` after every transliteration."""
+    if hook not in _observers:
+        _observers.append(hook)
+
+
+def remove_hook(hook):
+    if hook in _observers:
+        _observers.remove(hook)
+
+
+class HistogramCollector(object):
+    """A hook aggregating events for the Prometheus text format."""
+
+    def __init__(self, size_buckets=SIZE_BUCKETS,
+                 seconds_buckets=SECONDS_BUCKETS):
+        self.size_buckets = tuple(size_buckets)
+        self.seconds_buckets = tuple(seconds_buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def __call__(self, event):
+        size = event.input_length
+        for bound in self.size_buckets:
+            if size <= bound:
+                break
+        else:
+            bound = '+Inf'
+        key = (event.function, event.mode, str(bound))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(self.seconds_buckets)
+            series.calls += 1
+            series.input_chars += size
+            series.output_chars += len(event.output)
+            series.normalize.observe(event.normalize_seconds)
+            series.translate.observe(event.translate_seconds)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        """Return a snapshot in the Prometheus text exposition format."""
+        with self._lock:
+            series = sorted(self._series.items())
+            lines = []
+            for name, help, attr in (
+                    ('calls_total', 'Transliteration calls.', 'calls'),
+                    ('input_characters_total', 'Characters transliterated.',
+                     'input_chars'),
+                    ('output_characters_total', 'Characters produced.',
+                     'output_chars')):
+                lines.append('# HELP translitcodec_%s %s' % (name, help))
+                lines.append('# TYPE translitcodec_%s counter' % name)
+                for key, values in series:
+                    lines.append('translitcodec_%s{%s} %d' % (
+                        name, _labels(key), getattr(values, attr)))
+            for name, help, attr in (
+                    ('normalize_seconds', 'Time spent in NFKC normalization.',
+                     'normalize'),
+                    ('translate_seconds', 'Time spent in table translation.',
+                     'translate')):
+                lines.append('# HELP translitcodec_%s %s' % (name, help))
+                lines.append('# TYPE translitcodec_%s histogram' % name)
+                for key, values in series:
+                    lines.extend(getattr(values, attr).render(
+                        'translitcodec_' + name, _labels(key)))
+        return '\n'.join(lines) + '\n'
+
+
+class _Series(object):
+    def __init__(self, seconds_buckets):
+        self.calls = self.input_chars = self.output_chars = 0
+        self.normalize = _Histogram(seconds_buckets)
+        self.translate = _Histogram(seconds_buckets)
+
+
+class _Histogram(object):
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def render(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield '%s_bucket{%s,le="%s"} %d' % (name, labels, bound, cumulative)
+        yield '%s_sum{%s} %r' % (name, labels, self.sum)
+        yield '%s_count{%s} %d' % (name, labels, cumulative)
+
+
+def _labels(key):
+    return 'function="%s",mode="%s",size="%s"' % key
+
+
+def enable(collector=None):
+    """Install *collector*, or a new :class:`HistogramCollector`, as a hook.
+
+    Returns the installed collector.
+
+    """
+    global _collector
+    disable()
+    _collector = collector if collector is not None else HistogramCollector()
+    add_hook(_collector)
+    return _collector
+
+
+def disable():
+    """Remove the collector installed by enable()."""
+    global _collector
+    if _collector is not None:
+        remove_hook(_collector)
+        _collector = None
+
+
+def render():
+    """Render the collector installed by enable(), or nothing."""
+    if _collector is None:
+        return ''
+    return _collector.render()
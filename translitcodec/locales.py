@@ -0,0 +1,71 @@
+"""Locale profiles of the ``long`` transliteration.
+
+long_table has one answer per character, and some are right in one
+language only: ``ä`` becomes ``ae`` as in German, where Swedish and
+Finnish expect ``a``.  A profile is long_table with the deltas of a
+locale compiled in by compose(), so it costs a single translation like
+the default.  Profiles are available as ``translit/long@<locale>``
+codecs:
+
+  >>> import codecs
+  >>> codecs.encode('Smörgåsbord', 'translit/long@sv')
+  'Smorgasbord'
+  >>> codecs.encode('Ærøskøbing', 'translit/long@da/ascii')
+  b'AEroeskoebing'
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import unicodedata
+
+
+def _vietnamese():
+    # Every vowel with every tone mark loses its diacritics.
+    deltas = {'đ': 'd', 'Đ': 'D'}
+    for base in 'aăâeêioôơuưyAĂÂEÊIOÔƠUƯY':
+        for tone in ('', '̀', '́', '̃', '̉', '̣'):
+            char = unicodedata.normalize('NFC', base + tone)
+            deltas[char] = unicodedata.normalize('NFD', char)[0]
+    return deltas
+
+
+_NORDIC = {'ä': 'a', 'Ä': 'A', 'ö': 'o', 'Ö': 'O', 'å': 'a', 'Å': 'A'}
+
+# Changes to long_table per locale.
+_deltas = {
+    'de': {'ẞ': 'SS'},
+    'sv': _NORDIC,
+    'fi': _NORDIC,
+    'da': {'ø': 'oe', 'Ø': 'Oe', 'ǿ': 'oe', 'Ǿ': 'Oe'},
+    'nl': {'ä': 'a', 'Ä': 'A', 'ö': 'o', 'Ö': 'O', 'ü': 'u', 'Ü': 'U'},
+    'vi': _vietnamese(),
+    'tr': {'ö': 'o', 'Ö': 'O', 'ü': 'u', 'Ü': 'U'},
+}
+
+#: The locales with a profile.
+LOCALES = tuple(sorted(_deltas))
+
+_tables = {}
+
+
+def locale_table(locale):
+    """Return the table of the ``long`` profile for *locale*.
+
+    The table is a :class:`~translitcodec.tables.ComposedTable`, compiled
+    on first use and kept for good, whose mode is ``long@<locale>``.
+
+    """
+    table = _tables.get(locale)
+    if table is None:
+        # Imported here, as every codec lookup imports this module.
+        from translitcodec.tables import ComposedTable, compose
+        try:
+            deltas = _deltas[locale]
+        except KeyError:
+            raise ValueError('unknown locale %r' % (locale,))
+        composed = compose('long', overrides=deltas)
+        # A table of its own for the name, sharing the compiled dict.
+        table = _tables[locale] = ComposedTable(
+            composed.table, composed.fingerprint, 'long@' + locale)
+    return table
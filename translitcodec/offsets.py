@@ -0,0 +1,95 @@
+"""Transliteration that keeps track of where the output came from.
+
+transliterate_with_offsets() returns, along with the transliterated text,
+an ``array('I')`` giving for each output character the index of the input
+character it came from, so that positions found in the output, say by a
+search index, can be mapped back to the original text:
+
+  >>> text = 'Ærø £5'
+  >>> output, offsets = transliterate_with_offsets(text)
+  >>> output
+  'AEro GBP5'
+  >>> start = output.index('GBP')
+  >>> text[offsets[start]:offsets[start + 3]]
+  '£'
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import re
+import unicodedata
+from array import array
+
+from translitcodec import _ascii_changing_modes, _mode_table
+from translitcodec._sequences import sequence_table
+from translitcodec._unicode import backward_combining, char_class, nfkc_unstable
+from translitcodec.scan import _boundary_after
+
+
+# Per table, the output length of characters with a replacement that is not
+# a single character, and a finditer() over those characters and the ones
+# that need normalization along with their neighbours.
+_lengths = {}
+_finders = {}
+
+
+def transliterate_with_offsets(text, mode='long'):
+    """Transliterate *text* with *mode* and map the output to the input.
+
+    Returns ``(output, offsets)``.  ``offsets[i]`` is the index in *text*
+    where the characters producing ``output[i]`` start; all characters of
+    a multi-character replacement point at the same input character.  A
+    last entry holding ``len(text)`` follows, so the input range of
+    ``output[i:j]``, when *j* is at the start of a replacement, is
+    ``text[offsets[i]:offsets[j]]``.
+
+    """
+    table = _mode_table(mode)
+    if text.isascii() and mode not in _ascii_changing_modes:
+        return text, array('I', range(len(text) + 1))
+    finditer = _finders.get(id(table))
+    if finditer is None:
+        finditer = _compile(table)
+    lengths = _lengths[id(table)]
+    sequences = sequence_table(table)
+    backward = backward_combining()
+    offsets = array('I')
+    # Characters between the matches map one to one.
+    position = 0
+    for match in finditer(text):
+        index = match.start()
+        if index < position:
+            continue
+        char = text[index]
+        length = lengths.get(char)
+        if length is not None and not (
+                index + 1 < len(text) and ord(text[index + 1]) in backward):
+            offsets.extend(range(position, index))
+            offsets.extend((index,) * length)
+            position = index + 1
+            continue
+        # Everything from the starter before the match to the next
+        # normalization boundary maps to the starter.
+        start = index
+        if start > position and ord(char) in backward:
+            start -= 1
+        end = _boundary_after(text, index + 1, backward)
+        offsets.extend(range(position, start))
+        offsets.extend((start,) * len(sequences[text[start:end]]))
+        position = end
+    offsets.extend(range(position, len(text) + 1))
+    return unicodedata.normalize('NFKC', text).translate(table), offsets
+
+
+def _compile(table):
+    combining = nfkc_unstable() | backward_combining()
+    lengths = _lengths[id(table)] = {
+        chr(cp): len(value) for cp, value in table.items()
+        if len(value) != 1 and cp not in combining}
+    # All characters outside the BMP are matched; see scan._changing.
+    finditer = _finders[id(table)] = re.compile(
+        '[%s\\U00010000-\\U0010ffff]' % char_class(
+            cp for cp in set(map(ord, lengths)) | combining
+            if cp <= 0xffff)[1:-1]).finditer
+    return finditer
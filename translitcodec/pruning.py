@@ -0,0 +1,226 @@
+"""Profile-guided pruning of the transliteration tables.
+
+Most deployments only ever see a small part of the tables.  A
+:class:`Profile` records which entries fire on representative input,
+and write_module() emits a self-contained module holding just those
+entries, together with encoders and a codec search function using them.
+The emitted tables fall back to the full translitcodec tables, imported
+on first need, for characters the profile never saw, so output does not
+change; up to 4096 fallback results are remembered in the pruned table.
+
+The search function serves ``translit/<mode>`` and
+``translit/<mode>/<encoding>`` for the long, short and one modes.  Other
+names, such as the ``/fold`` modes and the locale profiles, are left to
+translitcodec, and so are the error handlers such as
+``replace/translit/long``: using them loads the full tables.
+
+  >>> from translitcodec.pruning import Profile, write_module
+  >>> profile = Profile()
+  >>> for line in open('sample.txt', encoding='utf-8'):
+  ...     profile.feed(line)
+  >>> write_module(profile, 'myservice/translit_tables.py')
+
+From the command line::
+
+  $ python -m translitcodec.pruning --output translit_tables.py sample.txt
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import argparse
+import collections
+import io
+import re
+import sys
+import unicodedata
+
+from translitcodec import __version__, _mode_table
+from translitcodec._compression import open_input
+
+
+_find_non_ascii = re.compile('[^\\x00-\\x7f]+').findall
+
+
+class Profile(object):
+    """Counts of how often each table entry fires, per mode."""
+
+    def __init__(self, modes=('long', 'short', 'one')):
+        self.counts = {mode: collections.Counter() for mode in modes}
+
+    def feed(self, text):
+        """Record the entries that transliterating *text* would use."""
+        normalized = unicodedata.normalize('NFKC', text)
+        if not normalized.isascii():
+            self._record(collections.Counter(
+                ''.join(_find_non_ascii(normalized))), self.counts)
+
+    def hook(self, event):
+        """Record a live transliteration; see translitcodec.instrumentation.
+
+        Pass this method to ``instrumentation.add_hook()`` to profile a
+        running service.
+
+        """
+        counts = self.counts.get(event.mode)
+        if counts is not None and not event.normalized.isascii():
+            self._record(collections.Counter(
+                ''.join(_find_non_ascii(event.normalized))),
+                {event.mode: counts})
+
+    @staticmethod
+    def _record(chars, counts):
+        for mode, mode_counts in counts.items():
+            table = _mode_table(mode)
+            for char, count in chars.items():
+                if ord(char) in table:
+                    mode_counts[ord(char)] += count
+
+    def entries(self, mode, min_count=1):
+        """Return the entries of *mode*'s table seen at least *min_count*
+        times."""
+        table = _mode_table(mode)
+        return {cp: table[cp] for cp, count in self.counts[mode].items()
+                if count >= min_count}
+
+
+def write_module(profile, path, min_count=1):
+    """Write a module with *profile*'s pruned tables to *path*."""
+    with io.open(path, 'w', encoding='utf-8') as fh:
+        fh.write(_MODULE_HEADER % {'version': __version__})
+        for mode in profile.counts:
+            fh.write('%s_table = _PrunedTable(%r, {\n' % (
+                _table_names[mode], mode))
+            for pair in sorted(profile.entries(mode, min_count).items()):
+                fh.write('  %r: %r,\n' % pair)
+            fh.write('})\n\n')
+        fh.write(_MODULE_FOOTER % {
+            'modes': ', '.join('%r: %s_table' % (mode, _table_names[mode])
+                               for mode in profile.counts)})
+
+
+_table_names = {'long': 'long', 'short': 'short', 'one': 'single'}
+
+_MODULE_HEADER = '''\
+"""Pruned transliteration tables generated by translitcodec.pruning.
+
+Generated from translitcodec %(version)s; do not edit.  Characters
+missing here are looked up in the full translitcodec tables.
+
+"""
+import codecs
+import sys
+import unicodedata
+
+
+# Characters missing from a table that are remembered once looked up.
+_MISSES_SIZE = 4096
+
+
+class _PrunedTable(dict):
+    __slots__ = ('mode', 'limit')
+
+    def __init__(self, mode, entries):
+        dict.__init__(self, entries)
+        self.mode = mode
+        self.limit = len(self) + _MISSES_SIZE
+
+    def __missing__(self, key):
+        if key < 128:
+            value = chr(key)
+        else:
+            import translitcodec
+            value = translitcodec._mode_tables[self.mode].get(key, chr(key))
+        if len(self) < self.limit:
+            self[key] = value
+        return value
+
+
+'''
+
+_MODULE_FOOTER = '''\
+_tables = {%(modes)s}
+
+
+def _encoder(table):
+    def encode(input, errors='strict'):
+        if not isinstance(input, str):
+            input = str(input, sys.getdefaultencoding(), errors)
+        length = len(input)
+        input = unicodedata.normalize('NFKC', input)
+        return input.translate(table), length
+    return encode
+
+
+encoders = {mode: _encoder(table) for mode, table in _tables.items()}
+
+
+def _no_decode(input, errors='strict'):
+    raise TypeError("transliterating codec does not support decode.")
+
+
+def _double_encoder(encode, byte_encode):
+    def dbl_encode(input, errors='strict'):
+        output, length = encode(input, errors)
+        return byte_encode(output, errors)[0], length
+    return dbl_encode
+
+
+def _search(encoding):
+    if encoding == 'transliterate':
+        encoding = 'translit/long'
+    for delim in '/_':
+        parts = encoding.split(delim)
+        mode = parts[1] if len(parts) > 1 else None
+        if parts[0] != 'translit' or mode not in encoders:
+            continue
+        encode = encoders[mode]
+        if len(parts) > 2:
+            try:
+                byte_encode = codecs.lookup(delim.join(parts[2:])).encode
+            except LookupError:
+                # Such as translit/long/fold, left to translitcodec.
+                return None
+            encode = _double_encoder(encode, byte_encode)
+        return codecs.CodecInfo(encode, _no_decode)
+    return None
+
+
+def register():
+    """Serve the ``translit/<mode>`` and ``translit/<mode>/<encoding>``
+    codecs from the pruned tables.
+
+    Call this before translitcodec is imported; the first registered
+    search function wins.
+
+    """
+    codecs.register(_search)
+'''
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m translitcodec.pruning',
+        description='Write a module with the table entries used by a '
+                    'sample corpus.')
+    parser.add_argument('paths', nargs='+', metavar='path',
+                        help='sample files')
+    parser.add_argument('-o', '--output', required=True,
+                        help='module file to write')
+    parser.add_argument('--min-count', type=int, default=1,
+                        help='drop entries seen fewer times (default: 1)')
+    parser.add_argument('--encoding', default='utf-8',
+                        help='encoding of the sample (default: utf-8)')
+    options = parser.parse_args(argv)
+    profile = Profile()
+    for path in options.paths:
+        with io.TextIOWrapper(open_input(path), encoding=options.encoding,
+                              errors='replace') as fh:
+            for line in fh:
+                profile.feed(line)
+    write_module(profile, options.output, options.min_count)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
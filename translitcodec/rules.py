@@ -0,0 +1,237 @@
+"""Romanization with context rules.
+
+Some scripts cannot be romanized one character at a time: in GOST 7.79
+System B, Cyrillic ``ц`` is ``c`` before ``е`` but ``cz`` elsewhere, and
+in ELOT 743 Greek ``αυ`` is ``av`` or ``af`` depending on what follows.  A
+:class:`RuleSet` holds a table for the characters on their own and
+regular expressions for the rules.  It runs both in two passes over the
+text, each of them in C: a substitution with all rules compiled into one
+pattern, then a translation.
+
+The ``translit/gost`` and ``translit/elot`` codecs romanize Cyrillic and
+Greek, and pass everything else through ``long_table``:
+
+  >>> import codecs
+  >>> codecs.encode('Цирк «Щелкунчик», ЦУМ', 'translit/gost')
+  'Cirk <<Shhelkunchik>>, CZUM'
+  >>> codecs.encode('Ευαγγέλιο, ΑΥΤΟ το μπαλκόνι', 'translit/elot')
+  'Evangelio, AFTO to balkoni'
+
+The helpers that return whole transliterated strings or their lengths,
+such as iter_transliterate(), transliterate_column() and
+transliterated_length(), accept these modes too.  The ones that need the
+replacement of each character on its own, which here depends on its
+neighbours, raise ValueError for them: iter_spans(),
+transliterate_prefix(), transliterate_with_offsets(), find_unmappable(),
+ShadowDocument, WordOverrides and compose().
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import re
+import sys
+import unicodedata
+
+from translitcodec import _observed_transliterate, _observers
+from translitcodec._unicode import _code_points, char_class
+from translitcodec.tables import compose
+
+
+_cased_classes = None
+
+
+class RuleSet(object):
+    """Romanization by *table* and the context *rules*.
+
+    *table* maps characters to their replacement when no rule applies;
+    characters it lacks are transliterated with ``long_table``.  Each
+    rule is a ``(pattern, replacement)`` pair.  Patterns are regular
+    expressions without capturing groups, matched without regard to
+    case, which begin with the letter they replace; context before it
+    is checked with a lookbehind after it, as in ``'μπ(?<!\\wμπ)'``.  At
+    each position the first rule that matches applies.  Replacements
+    are given in lower case and take the case of the text they replace.
+
+    An uppercase letter whose replacement in *table* has more than one
+    letter is written all in upper case when its word is: ``Ч`` is
+    ``Ch`` in ``Чехов`` but ``CH`` in ``ЧЕХОВ``.
+
+    *mode* names the rule set in the events of
+    translitcodec.instrumentation.
+
+    """
+
+    def __init__(self, table, rules=(), mode='rules'):
+        self.mode = mode
+        self.table = compose('long', overrides=table).table
+        self.replacements = [None]
+        # The pattern starts with a class of the first letters of all
+        # rules, which re scans for quickly, and then tells the rules
+        # apart by that letter with lookbehinds: it could do neither
+        # without regard to case.
+        branches = {}
+        for pattern, replacement in rules:
+            if not pattern[:1].isalpha():
+                raise ValueError('rule %r does not begin with a letter'
+                                 % (pattern,))
+            head = frozenset(char for char in (pattern[0], pattern[0].upper())
+                             if len(char) == 1)
+            branches.setdefault(head, []).append(
+                ('((?i:%s))' % pattern[1:], replacement))
+        multiple = frozenset(char for char in table if char.isupper() and
+                             sum(map(str.isalpha, table[char])) > 1)
+        if multiple:
+            upper, lower = _cased()
+            branches.setdefault(multiple, []).append((
+                '((?=%s)|(?<=%s%s)(?!%s))' % (
+                    upper, upper, char_class(map(ord, multiple)), lower),
+                None))
+        groups = []
+        for head, alternatives in branches.items():
+            groups.append('(?<=%s)(?:%s)' % (
+                char_class(map(ord, head)),
+                '|'.join(pattern for pattern, _ in alternatives)))
+            self.replacements.extend(
+                replacement for _, replacement in alternatives)
+        self.sub = re.compile('%s(?:%s)' % (
+            char_class(map(ord, frozenset().union(*branches))),
+            '|'.join(groups))).sub
+
+    def translate(self, text):
+        """Normalize *text* with NFKC and romanize it."""
+        return self._romanize(unicodedata.normalize('NFKC', text))
+
+    def encode(self, input, errors='strict'):
+        """Romanize like the encoders of the ``translit/<mode>`` codecs."""
+        if not isinstance(input, str):
+            input = str(input, sys.getdefaultencoding(), errors)
+        if _observers:
+            return _observed_transliterate(
+                'RuleSet.encode', self.mode, input, self.table,
+                self._romanize), len(input)
+        return self.translate(input), len(input)
+
+    def _romanize(self, normalized):
+        return self.sub(self._replace, normalized).translate(self.table)
+
+    def _replace(self, match):
+        source = match.group()
+        replacement = self.replacements[match.lastindex]
+        if replacement is None:
+            return self.table[ord(source)].upper()
+        if not source[0].isupper():
+            return replacement
+        if len(source) > 1 and source.isupper():
+            return replacement.upper()
+        return replacement[:1].upper() + replacement[1:]
+
+
+def _cased():
+    """Return classes of the uppercase and the lowercase letters."""
+    global _cased_classes
+    if _cased_classes is None:
+        upper = []
+        lower = []
+        for cp in _code_points():
+            char = chr(cp)
+            if char.isupper():
+                upper.append(cp)
+            elif char.islower():
+                lower.append(cp)
+        _cased_classes = char_class(upper), char_class(lower)
+    return _cased_classes
+
+
+def _with_capitals(table):
+    table = dict(table)
+    for char, value in list(table.items()):
+        # Some, like ΐ, have no single uppercase letter.
+        if len(char.upper()) == 1:
+            table.setdefault(char.upper(), value[:1].upper() + value[1:])
+    return table
+
+
+#: GOST 7.79-2000 System B, with the Russian readings of the letters
+#: whose romanization depends on the language.
+GOST_TABLE = _with_capitals({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo',
+    'ж': 'zh', 'з': 'z', 'и': 'i', 'й': 'j', 'к': 'k', 'л': 'l', 'м': 'm',
+    'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u',
+    'ф': 'f', 'х': 'x', 'ц': 'cz', 'ч': 'ch', 'ш': 'sh', 'щ': 'shh',
+    'ъ': '``', 'ы': "y'", 'ь': '`', 'э': 'e`', 'ю': 'yu', 'я': 'ya',
+    'ѣ': 'ye', 'ѳ': 'fh', 'ѵ': 'yh',
+    'ґ': 'g`', 'є': 'ye', 'і': 'i', 'ї': 'yi', 'ў': 'u`',
+    'ѓ': 'g`', 'ѕ': 'z`', 'ј': 'j', 'ќ': 'k`', 'љ': 'l`', 'њ': 'n`',
+    'џ': 'dh',
+})
+
+GOST_RULES = [
+    # c before i, e, y and j, cz elsewhere.
+    ('ц(?=[иеёэыюяйіѣєї])', 'c'),
+]
+
+_GREEK_LETTER = '[α-ωάέήίόύώϊϋΐΰ]'
+_VOICELESS = '[θκξπσςτφχψ]'
+
+#: ELOT 743, the Greek standard also published as ISO 843.
+ELOT_TABLE = _with_capitals({
+    'α': 'a', 'β': 'v', 'γ': 'g', 'δ': 'd', 'ε': 'e', 'ζ': 'z', 'η': 'i',
+    'θ': 'th', 'ι': 'i', 'κ': 'k', 'λ': 'l', 'μ': 'm', 'ν': 'n', 'ξ': 'x',
+    'ο': 'o', 'π': 'p', 'ρ': 'r', 'σ': 's', 'ς': 's', 'τ': 't', 'υ': 'y',
+    'φ': 'f', 'χ': 'ch', 'ψ': 'ps', 'ω': 'o',
+    'ά': 'a', 'έ': 'e', 'ή': 'i', 'ί': 'i', 'ό': 'o', 'ύ': 'y', 'ώ': 'o',
+    'ϊ': 'i', 'ϋ': 'y', 'ΐ': 'i', 'ΰ': 'y',
+})
+
+ELOT_RULES = [
+    # αυ, ευ and ηυ are af, ef and if before voiceless consonants and at
+    # the end of a word, av, ev and iv elsewhere.
+    ('α[υύ](?=%s|(?!%s))' % (_VOICELESS, _GREEK_LETTER), 'af'),
+    ('α[υύ]', 'av'),
+    ('ε[υύ](?=%s|(?!%s))' % (_VOICELESS, _GREEK_LETTER), 'ef'),
+    ('ε[υύ]', 'ev'),
+    ('η[υύ](?=%s|(?!%s))' % (_VOICELESS, _GREEK_LETTER), 'if'),
+    ('η[υύ]', 'iv'),
+    ('ο[υύ]', 'ou'),
+    ('γ(?=[γξχ])', 'n'),
+    # b at the start and the end of a word, mb inside.
+    ('μπ(?<!\\wμπ)', 'b'),
+    ('μπ(?!\\w)', 'b'),
+    ('μπ', 'mb'),
+]
+
+_rule_sets = {}
+
+
+def _rule_set(name):
+    rule_set = _rule_sets.get(name)
+    if rule_set is None:
+        if name == 'gost':
+            rule_set = RuleSet(GOST_TABLE, GOST_RULES, 'gost')
+        else:
+            rule_set = RuleSet(ELOT_TABLE, ELOT_RULES, 'elot')
+        _rule_sets[name] = rule_set
+    return rule_set
+
+
+def gost_encode(input, errors='strict'):
+    """Romanize Cyrillic by GOST 7.79 System B, and transliterate the
+    rest like long_encode().
+
+    For example, Щ CYRILLIC CAPITAL LETTER SHCHA ``Щ`` will be
+    replaced with ``Shh``.
+
+    """
+    return _rule_set('gost').encode(input, errors)
+
+
+def elot_encode(input, errors='strict'):
+    """Romanize Greek by ELOT 743, and transliterate the rest like
+    long_encode().
+
+    For example, θ GREEK SMALL LETTER THETA ``θ`` will be replaced
+    with ``th``.
+
+    """
+    return _rule_set('elot').encode(input, errors)
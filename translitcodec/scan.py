@@ -0,0 +1,412 @@
+"""Questions about a text answered in a single scan, and without
+transliterating more of it than needed.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import codecs
+import re
+import unicodedata
+
+from translitcodec import (
+    _ascii_changing_modes,
+    _mode_encoder,
+    _mode_table,
+    _mode_tables,
+)
+from translitcodec._sequences import sequence_table
+from translitcodec._unicode import backward_combining, char_class, nfkc_unstable
+
+
+_validators = {}
+
+# Per table, a pattern matching runs of characters that transliteration
+# may change: table keys, characters NFKC changes on their own and
+# characters that may combine with their predecessor.  All characters
+# outside the BMP are included, as re tests those of a class one range at
+# a time instead of by bitmap; iter_spans() drops the ones left unchanged.
+_changing = {}
+
+# Per mode and, for encoded_length(), encoding and error handler.
+_lengths = {}
+
+# Segments whose output length change a _Lengths remembers.
+_SEGMENT_DELTAS_SIZE = 8192
+
+# Codecs whose output for a character depends on what came before it.
+_STATEFUL = ('utf-7', 'idna', 'punycode', 'hz', 'iso2022')
+
+# Error handlers whose output for a run of characters is the output for
+# each of them in turn.
+_ADDITIVE_ERRORS = ('strict', 'ignore', 'replace', 'xmlcharrefreplace',
+                    'backslashreplace', 'namereplace')
+
+
+def find_unmappable(text, mode='long', target_encoding='ascii'):
+    """Return the positions in *text* that *target_encoding* cannot hold,
+    even after transliteration.
+
+    These are the characters for which encoding with the
+    ``strict/translit/<mode>`` error handler raises, all found in one
+    linear scan instead of one encode attempt per error:
+
+      >>> find_unmappable('Łódź ☺ 另', 'long', 'latin-1')
+      [7]
+
+    """
+    key = (mode, codecs.lookup(target_encoding).name)
+    validator = _validators.get(key)
+    if validator is None:
+        validator = _validators[key] = _Validator(_mode_table(mode), key[1])
+    return validator(text)
+
+
+class _Validator(object):
+    """Finds unmappable characters for one table and encoding."""
+
+    def __init__(self, table, encoding):
+        self.table = table
+        self.encoding = encoding
+        # Characters known to encode are skipped by a compiled character
+        # class; everything else is checked once and remembered.
+        encodable = set()
+        for char in bytes(range(256)).decode(encoding, 'ignore'):
+            if self._encodes(char):
+                encodable.add(ord(char))
+        self.candidates = re.compile(
+            '[^%s]' % char_class(encodable)[1:-1] if encodable else '.',
+            re.DOTALL).finditer
+        self.unmappable = {}
+        # Error handlers see the whole run of unencodable characters with
+        # most codecs, but only one character at a time with the CJK ones.
+        self.runs = self._error_length('\udc80\udc81') > 1
+
+    def _error_length(self, text):
+        try:
+            text.encode(self.encoding)
+        except UnicodeEncodeError as exc:
+            return exc.end - exc.start
+        return 0
+
+    def _encodes(self, text):
+        try:
+            text.encode(self.encoding)
+        except UnicodeError:
+            return False
+        return True
+
+    def __call__(self, text):
+        positions = []
+        unmappable = self.unmappable
+        backward = backward_combining()
+        for match in self.candidates(text):
+            start = match.start()
+            char = match.group()
+            end = start + 1
+            if self.runs:
+                while (end < len(text) and ord(text[end]) in backward and
+                       not self._encodes(text[end])):
+                    end += 1
+            if end > start + 1:
+                if self._check(text[start:end]):
+                    positions.append(start)
+                continue
+            result = unmappable.get(char)
+            if result is None:
+                result = unmappable[char] = self._check(char)
+            if result:
+                positions.append(start)
+        return positions
+
+    def _check(self, text):
+        if self._encodes(text[0]):
+            return False
+        char = unicodedata.normalize('NFKC', text)[0]
+        new_char = char.translate(self.table)
+        return new_char == char or not self._encodes(new_char)
+
+
+def _changing_runs(table):
+    finditer = _changing.get(id(table))
+    if finditer is None:
+        bmp = {cp for cp in set(table) | nfkc_unstable() | backward_combining()
+               if cp <= 0xffff}
+        finditer = _changing[id(table)] = re.compile(
+            '[%s\\U00010000-\\U0010ffff]+' % char_class(bmp)[1:-1]).finditer
+    return finditer
+
+
+def _candidate_spans(text, table):
+    """Yield spans of *text* which transliteration may change.
+
+    Each span starts and ends at a normalization boundary, so it can be
+    transliterated on its own, and everything outside the spans is left
+    unchanged.
+
+    """
+    backward = backward_combining()
+    for match in _changing_runs(table)(text):
+        start, end = match.span()
+        if start and ord(text[start]) in backward:
+            start -= 1
+        yield start, end
+
+
+def iter_spans(text, mode='long'):
+    """Yield ``(start, end)`` for each part of *text* that transliteration
+    changes.
+
+    Spans are in order and do not overlap.  Transliterating each span on
+    its own and leaving the rest of *text* untouched gives the same result
+    as transliterating all of *text*:
+
+      >>> list(iter_spans('Smörgåsbord, £5'))
+      [(2, 3), (5, 6), (13, 14)]
+
+    """
+    table = _mode_table(mode)
+    if text.isascii() and mode not in _ascii_changing_modes:
+        return
+    sequences = sequence_table(table)
+    for start, end in _candidate_spans(text, table):
+        part = text[start:end]
+        if sequences[part] != part:
+            yield start, end
+
+
+def needs_transliteration(text, mode='long'):
+    """Whether transliterating *text* with *mode* would change it."""
+    if mode not in _mode_tables:
+        return _mode_encoder(mode)(text)[0] != text
+    for _ in iter_spans(text, mode):
+        return True
+    return False
+
+
+def transliterated_length(text, mode='long'):
+    """Return the length of *text* transliterated with *mode*.
+
+    The transliterated text is never built: in the common case the length
+    is that of *text* plus a precomputed change for each character whose
+    replacement is not a single character:
+
+      >>> transliterated_length('Straße ½')
+      11
+
+    """
+    if text.isascii():
+        return len(text)
+    if mode not in _mode_tables:
+        return len(_mode_encoder(mode)(text)[0])
+    lengths = _lengths.get(mode)
+    if lengths is None:
+        lengths = _lengths[mode] = _Lengths(_mode_table(mode))
+    return lengths(text)
+
+
+def encoded_length(text, mode='long', encoding='utf-8', errors='strict'):
+    """Return the length in bytes of *text* encoded with the
+    ``translit/<mode>/<encoding>`` codec.
+
+    Byte counts come from a per character width model of *encoding*; the
+    characters that are not already the common width, usually just the
+    non-ASCII ones, are looked at one by one.  Codecs that keep state
+    between characters, and error handlers other than the builtin ones,
+    are measured by encoding.
+
+      >>> encoded_length('Łódź ½', 'long', 'utf-8')
+      8
+
+    """
+    key = (mode, encoding, errors)
+    if key not in _lengths:
+        name = codecs.lookup(encoding).name
+        if (mode in _mode_tables and errors in _ADDITIVE_ERRORS and
+                not name.startswith(_STATEFUL)):
+            _lengths[key] = _Lengths(_mode_table(mode),
+                                     _ByteCounter(name, errors))
+        else:
+            _lengths[key] = None
+    lengths = _lengths[key]
+    if lengths is None:
+        return len(codecs.encode(
+            _mode_encoder(mode)(text)[0], encoding, errors))
+    try:
+        return lengths(text)
+    except UnicodeEncodeError:
+        # Raise the error the codec itself raises.
+        codecs.encode(_mode_encoder(mode)(text)[0], encoding, errors)
+        raise
+
+
+class _Lengths(object):
+    """Output lengths for one table, in characters or, with a
+    :class:`_ByteCounter`, in bytes."""
+
+    def __init__(self, table, counter=None):
+        self.table = table
+        self.counter = counter
+        # Text without these is its own NFKC form, and each of its
+        # characters is translated on its own.
+        combining = nfkc_unstable() | backward_combining()
+        self.combining = set(map(chr, combining))
+        self.replacements = {chr(cp): value for cp, value in table.items()
+                             if cp not in combining}
+        # Found by self.others: the characters with a delta from the
+        # width, those whose delta is not known yet and those needing
+        # normalization; see the note on _changing.
+        if counter is None:
+            self.width = 1
+            self.overhead = 0
+            self.deltas = {char: len(value) - 1
+                           for char, value in self.replacements.items()
+                           if len(value) != 1}
+            others = '[%s\\U00010000-\\U0010ffff]' % char_class(
+                cp for cp in set(map(ord, self.deltas)) | combining
+                if cp <= 0xffff)[1:-1]
+        else:
+            self.width = counter.width
+            self.overhead = counter.overhead
+            self.deltas = {}
+            plain = counter.common - combining - set(table)
+            others = '[^%s]' % char_class(plain)[1:-1] if plain else '(?s:.)'
+        self.others = re.compile(others).findall
+        # Once a character needing normalization turns up, the text is
+        # taken as whole segments: a character with the combining ones
+        # after it, looked up in the sequence table, or one of the others.
+        self.segments = re.compile('(?s:.)[%s\\U00010000-\\U0010ffff]+|%s' % (
+            char_class(cp for cp in backward_combining()
+                       if cp <= 0xffff)[1:-1], others)).findall
+        self.sequences = sequence_table(table)
+        self.segment_deltas = {}
+
+    def __call__(self, text):
+        others = self.others(text)
+        try:
+            return self.overhead + len(text) * self.width + sum(
+                map(self.deltas.__getitem__, others))
+        except KeyError:
+            pass
+        deltas = self.deltas
+        for char in others:
+            if char in deltas:
+                continue
+            if char in self.combining:
+                return self._count_segments(text)
+            deltas[char] = self._delta(char, self.replacements.get(char, char))
+        return self.overhead + len(text) * self.width + sum(
+            map(deltas.__getitem__, others))
+
+    def _count_segments(self, text):
+        segments = self.segments(text)
+        deltas = self.segment_deltas
+        try:
+            return self.overhead + len(text) * self.width + sum(
+                map(deltas.__getitem__, segments))
+        except KeyError:
+            pass
+        if len(deltas) >= _SEGMENT_DELTAS_SIZE:
+            deltas.clear()
+        for segment in segments:
+            if segment not in deltas:
+                deltas[segment] = self._delta(
+                    segment, self.sequences[segment])
+        return self.overhead + len(text) * self.width + sum(
+            map(deltas.__getitem__, segments))
+
+    def _delta(self, source, replacement):
+        if self.counter is None:
+            return len(replacement) - len(source)
+        return self.counter.count(replacement) - self.width * len(source)
+
+
+class _ByteCounter(object):
+    """Counts the bytes a stateless codec produces for a text."""
+
+    def __init__(self, encoding, errors):
+        self.encode = codecs.lookup(encoding).encode
+        self.errors = errors
+        self.overhead = len(self.encode('', errors)[0])
+        self.width = self._width('a')
+        self.common = set()
+        for char in set(map(chr, range(128))) | set(
+                bytes(range(256)).decode(encoding, 'ignore')):
+            try:
+                if self._width(char) == self.width:
+                    self.common.add(ord(char))
+            except UnicodeEncodeError:
+                pass
+        self.others = re.compile(
+            '[^%s]' % char_class(self.common)[1:-1], re.DOTALL).findall
+        self.widths = {}
+
+    def _width(self, char):
+        return len(self.encode(char, self.errors)[0]) - self.overhead
+
+    def count(self, text, start=0, end=None):
+        if end is None:
+            end = len(text)
+        length = (end - start) * self.width
+        widths = self.widths
+        for char in self.others(text, start, end):
+            width = widths.get(char)
+            if width is None:
+                width = widths[char] = self._width(char)
+            length += width - self.width
+        return length
+
+
+def transliterate_prefix(text, max_output_chars, mode='long'):
+    """Return the start of *text* transliterated with *mode*, at most
+    *max_output_chars* long.
+
+    The result is a prefix of the full transliteration that ends between
+    two replacements, so a multi-character replacement is never cut:
+
+      >>> transliterate_prefix('£5 Ærø', 4)
+      'GBP5'
+      >>> transliterate_prefix('£5 Ærø', 6)
+      'GBP5 '
+
+    Only as much of *text* as needed is normalized and translated, so the
+    cost follows the length of the prefix, not of *text*.
+
+    """
+    table = _mode_table(mode)
+    backward = backward_combining()
+    pieces = []
+    remaining = max_output_chars
+    position = 0
+    size = max(remaining, 64)
+    while position < len(text) and remaining > 0:
+        end = _boundary_after(text, position + size, backward)
+        out = unicodedata.normalize('NFKC', text[position:end]).translate(
+            table)
+        if len(out) <= remaining:
+            pieces.append(out)
+            remaining -= len(out)
+            position = end
+            size = max(remaining, 64)
+        elif size > 16:
+            size //= 2
+        else:
+            # Take the segments between normalization boundaries that fit.
+            sequences = sequence_table(table)
+            while position < end:
+                stop = _boundary_after(text, position + 1, backward)
+                out = sequences[text[position:stop]]
+                if len(out) > remaining:
+                    break
+                pieces.append(out)
+                remaining -= len(out)
+                position = stop
+            break
+    return ''.join(pieces)
+
+
+def _boundary_after(text, position, backward):
+    """Return the first normalization boundary at or after *position*."""
+    while position < len(text) and ord(text[position]) in backward:
+        position += 1
+    return min(position, len(text))
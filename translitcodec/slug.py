@@ -0,0 +1,93 @@
+"""URL slugs from the transliteration tables.
+
+slugify() gives the same result as transliterating with ``translit/long``,
+lowercasing and joining the runs of ASCII letters and digits with a
+separator, but in a single translation with a table that does all three:
+
+  >>> slugify('Straße nach Łódź — 5 €')
+  'strasse-nach-lodz-5-eur'
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import re
+import string
+import unicodedata
+
+from translitcodec import _mode_table, long_table
+from translitcodec._unicode import backward_combining
+from translitcodec.scan import _boundary_after
+
+
+_KEEP = frozenset(string.ascii_lowercase + string.digits)
+
+# Characters the slug table does not cover; all of them separate words.
+_find_uncovered = re.compile('[^\\x00-\\x7f]+').sub
+
+_table = None
+
+
+def slugify(text, sep='-', max_len=None):
+    """Return a slug for *text*: lowercase ASCII words joined by *sep*.
+
+    With *max_len*, the slug ends after the last whole word that fits; a
+    first word longer than *max_len* is cut.  Only as much of *text* as
+    needed is transliterated:
+
+      >>> slugify('Łódź, Kraków and Gdańsk', max_len=12)
+      'lodz-krakow'
+
+    """
+    table = _table or _load_table()
+    if max_len is None:
+        return sep.join(_words(text, table))
+    backward = backward_combining()
+    words = []
+    length = -len(sep)
+    carry = ''
+    position = 0
+    while position < len(text):
+        end = _boundary_after(text, position + max(max_len, 64), backward)
+        chunk = carry + _words(text[position:end], table, split=False)
+        position = end
+        pieces = chunk.split()
+        # The last word may go on in the next chunk.
+        carry = pieces.pop() if pieces and not chunk[-1].isspace() else ''
+        for word in pieces:
+            length += len(sep) + len(word)
+            if length > max_len:
+                return sep.join(words) if words else word[:max_len]
+            words.append(word)
+    if carry:
+        length += len(sep) + len(carry)
+        if length > max_len:
+            return sep.join(words) if words else carry[:max_len]
+        words.append(carry)
+    return sep.join(words)
+
+
+def _words(text, table, split=True):
+    text = unicodedata.normalize('NFKC', text).translate(table)
+    if not text.isascii():
+        text = _find_uncovered(' ', text)
+    return text.split() if split else text
+
+
+def _load_table():
+    """Compose long_table, lowercasing and the separator mapping.
+
+    Every character whose transliteration lowercases to something with
+    ASCII letters or digits is a key of long_table or of long_fold_table,
+    which also has all of ASCII.
+
+    """
+    global _table
+    table = {}
+    for cp in set(long_table).union(_mode_table('long/fold')):
+        char = chr(cp)
+        table[cp] = ''.join(
+            c if c in _KEEP else ' '
+            for c in long_table.get(cp, char).lower())
+    _table = table
+    return table
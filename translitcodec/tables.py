@@ -0,0 +1,176 @@
+"""Composition of the transliteration tables with other mappings.
+
+compose() turns a pipeline of per character rewrites, such as a
+transliteration mode followed by mappings of your own, into a single
+table, so the whole pipeline runs as one NFKC normalization and one
+``str.translate()``:
+
+  >>> table = compose('long', {'"': None, "'": None, '|': '/'},
+  ...                 overrides={'€': 'euro'})
+  >>> table.translate('"Łódź" | 5 €')
+  'Lodz / 5 euro'
+
+Compositions are cached by a hash of their content, so composing the
+same pipeline again returns the table already compiled.  The cache keeps
+the :data:`CACHE_SIZE` tables used most recently, which makes compose() a
+cheap way to give each of many users a variant of a mode with overrides of
+their own; cache_info() tells what each cached variant costs in memory.
+Replacements equal to those of the steps share their string objects, so
+a variant mostly costs the flat dict itself.
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import collections
+import hashlib
+import sys
+import threading
+import unicodedata
+
+from translitcodec import (
+    _mode_table,
+    _mode_tables,
+    _observed_transliterate,
+    _observers,
+    _pad_ascii,
+)
+
+
+#: Compiled tables kept in the cache of compose().
+CACHE_SIZE = 64
+
+CachedTable = collections.namedtuple('CachedTable', 'fingerprint entries size')
+
+_lock = threading.Lock()
+_compiled = collections.OrderedDict()
+
+
+class ComposedTable(object):
+    """A compiled table made by compose().
+
+    *table* is the plain dict to give ``str.translate()``; a dict
+    subclass would be slower, as translate() looks for ``__missing__``
+    on every character the table lacks.  *fingerprint* is the hash of
+    the steps it was compiled from, and *mode* names the table in the
+    events of translitcodec.instrumentation.
+
+    """
+
+    def __init__(self, table, fingerprint, mode='composed'):
+        self.table = table
+        self.fingerprint = fingerprint
+        self.mode = mode
+
+    def translate(self, text):
+        """Normalize *text* with NFKC and translate it with the table."""
+        return unicodedata.normalize('NFKC', text).translate(self.table)
+
+    def encode(self, input, errors='strict'):
+        """Translate like the encoders of the ``translit/<mode>`` codecs."""
+        if not isinstance(input, str):
+            input = str(input, sys.getdefaultencoding(), errors)
+        if _observers:
+            return _observed_transliterate('ComposedTable.encode', self.mode,
+                                           input, self.table), len(input)
+        return unicodedata.normalize('NFKC', input).translate(
+            self.table), len(input)
+
+
+def compose(*steps, overrides=None):
+    """Compile *steps* into a single :class:`ComposedTable`.
+
+    Each step is the name of a transliteration mode, such as ``'long'``,
+    or a mapping in the form ``str.maketrans()`` accepts: single
+    characters or code points to strings, code points or ``None``.
+    Translating with the result equals NFKC normalizing and then applying
+    ``str.translate()`` with each step in turn.  The *overrides* mapping
+    comes last and replaces the outcome for its characters entirely.
+
+    """
+    tables = [_step_table(step) for step in steps]
+    overrides = str.maketrans(overrides or {})
+    # Modes and composed tables are identified by name and fingerprint,
+    # mappings by their content.
+    content = [step if isinstance(step, str) else
+               step.fingerprint if isinstance(step, ComposedTable) else
+               sorted(table.items())
+               for step, table in zip(steps, tables)]
+    content.append(sorted(overrides.items()))
+    fingerprint = hashlib.sha1(repr(content).encode(
+        'utf-8', 'surrogatepass')).hexdigest()
+    with _lock:
+        table = _compiled.get(fingerprint)
+        if table is not None:
+            _compiled.move_to_end(fingerprint)
+            return table
+    table = ComposedTable(_compile(tables, overrides), fingerprint)
+    with _lock:
+        table = _compiled.setdefault(fingerprint, table)
+        while len(_compiled) > CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return table
+
+
+def cache_info():
+    """Return a :class:`CachedTable` for each table in the cache of
+    compose(), most recently used first.
+
+    *size* is the memory in bytes the table holds on its own: the dict
+    and the replacement strings that neither a mode table nor another
+    cached table shares.
+
+    """
+    with _lock:
+        tables = list(reversed(_compiled.values()))
+    shared = collections.Counter()
+    for table in _mode_tables.values():
+        shared.update(set(map(id, table.values())))
+    for composed in tables:
+        shared.update(set(map(id, composed.table.values())))
+    info = []
+    for composed in tables:
+        table = composed.table
+        own = {id(value): value for value in table.values()
+               if shared[id(value)] == 1}
+        info.append(CachedTable(composed.fingerprint, len(table),
+                                sys.getsizeof(table) +
+                                sum(map(sys.getsizeof, own.values()))))
+    return info
+
+
+def _step_table(step):
+    if isinstance(step, str):
+        return _mode_table(step)
+    if isinstance(step, ComposedTable):
+        return step.table
+    return str.maketrans(step)
+
+
+def _compile(tables, overrides):
+    keys = set(overrides)
+    for table in tables:
+        keys.update(table)
+    compiled = {}
+    for cp in keys:
+        text = chr(cp)
+        for table in tables:
+            text = text.translate(table)
+        if text != chr(cp):
+            compiled[cp] = _shared(text, cp, tables)
+    for cp, value in overrides.items():
+        compiled[cp] = '' if value is None else (
+            chr(value) if isinstance(value, int) else sys.intern(value))
+    if any(cp < 128 for cp in compiled):
+        _pad_ascii(compiled)
+    return compiled
+
+
+def _shared(text, cp, tables):
+    """Return the replacement of *cp* in one of *tables* if it equals
+    *text*, and *text* interned otherwise."""
+    for table in tables:
+        value = table.get(cp)
+        if value == text and isinstance(value, str):
+            return value
+    return sys.intern(text)
@@ -0,0 +1,155 @@
+"""Counting of characters the transliteration tables do not cover.
+
+Telemetry is off until enable() is called.  While enabled, every non-ASCII
+character that passes through a mode's table unchanged, or that an error
+handler fails to transliterate, is counted per mode.  Memory stays
+bounded: each mode keeps only the most frequent characters, tracked with
+the Space-Saving algorithm.
+
+  >>> import codecs
+  >>> from translitcodec import telemetry
+  >>> telemetry.enable()
+  >>> codecs.encode('☃ ☃ 另', 'translit/long')
+  '☃ ☃ 另'
+  >>> telemetry.snapshot()['long']
+  [UnmappedCount(char='☃', count=2, error=0), UnmappedCount(char='另', count=1, error=0)]
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import collections
+import heapq
+import itertools
+import re
+import threading
+
+from translitcodec import _mode_tables, _observers
+from translitcodec._unicode import char_class
+
+
+UnmappedCount = collections.namedtuple('UnmappedCount', 'char count error')
+
+_lock = threading.Lock()
+_counters = {}
+_capacity = 256
+
+# Per table, a findall() over characters that are neither ASCII nor mapped.
+_finders = {}
+
+
+class SpaceSaving(object):
+    """Approximate counts of the most frequent items in a stream.
+
+    At most *capacity* items are tracked.  When a new item arrives and
+    the counter is full, the item with the lowest count is evicted and
+    the newcomer inherits its count, so an item's count may overestimate
+    its true frequency by at most its recorded error.  Any item occurring
+    more often than ``total / capacity`` times is guaranteed a place.
+
+    Counting a tracked item is a dict update, and evicting one takes
+    logarithmic time on average.
+
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # A heap of (count, order, item), one entry per tracked item.
+        # Counts only grow, so an entry may hold less than its item's
+        # count; it is brought up to date when it comes to the top.
+        self._heap = []
+        self._order = itertools.count()
+
+    def add(self, item, count=1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+            return
+        heap = self._heap
+        if len(counts) < self.capacity:
+            counts[item] = count
+            self.errors[item] = 0
+            heapq.heappush(heap, (count, next(self._order), item))
+            return
+        while True:
+            floor, _, evicted = heap[0]
+            current = counts[evicted]
+            if current == floor:
+                break
+            heapq.heapreplace(heap, (current, next(self._order), evicted))
+        del counts[evicted]
+        del self.errors[evicted]
+        counts[item] = floor + count
+        self.errors[item] = floor
+        heapq.heapreplace(heap, (floor + count, next(self._order), item))
+
+    def most_common(self, n=None):
+        """Return ``(item, count, error)`` triples, most frequent first."""
+        ranked = sorted(self.counts.items(), key=lambda pair: -pair[1])
+        return [(item, count, self.errors[item])
+                for item, count in ranked[:n]]
+
+
+def enable(capacity=256):
+    """Start counting unmapped characters, keeping *capacity* per mode."""
+    global _capacity
+    with _lock:
+        if _capacity != capacity:
+            _capacity = capacity
+            _counters.clear()
+        if _observe not in _observers:
+            _observers.append(_observe)
+
+
+def disable():
+    """Stop counting.  Counts gathered so far are kept."""
+    with _lock:
+        if _observe in _observers:
+            _observers.remove(_observe)
+
+
+def is_enabled():
+    return _observe in _observers
+
+
+def reset():
+    """Discard all counts."""
+    with _lock:
+        _counters.clear()
+
+
+def snapshot():
+    """Return the counts gathered so far.
+
+    The result maps each mode name to a list of :class:`UnmappedCount`
+    tuples, most frequent first.
+
+    """
+    with _lock:
+        return {mode: [UnmappedCount(*entry) for entry in counter.most_common()]
+                for mode, counter in _counters.items()}
+
+
+def _observe(event):
+    normalized = event.normalized
+    if normalized.isascii():
+        return
+    table = event.table
+    if event.mode.endswith('/fold'):
+        # The fold tables also hold the characters they only casefold.
+        table = _mode_tables[event.mode.split('/')[0]]
+    finder = _finders.get(id(table))
+    if finder is None:
+        finder = _finders[id(table)] = re.compile(
+            '[^%s]' % char_class(set(range(0x80)) | set(table))[1:-1]).findall
+    unmapped = finder(normalized)
+    if not unmapped:
+        return
+    with _lock:
+        counter = _counters.get(event.mode)
+        if counter is None:
+            counter = _counters[event.mode] = SpaceSaving(_capacity)
+        for char in unmapped:
+            counter.add(char)
@@ -0,0 +1,129 @@
+"""Whole word and phrase overrides for transliteration.
+
+The tables work one character at a time, so they cannot keep a brand or
+place name the way its owners spell it in ASCII.  :class:`WordOverrides`
+replaces the words and phrases of a dictionary and transliterates the
+rest of the text with a mode, in one pass:
+
+  >>> overrides = WordOverrides({'Gödel': 'Godel', 'São Paulo': 'Sao Paulo'},
+  ...                           case_sensitive=False)
+  >>> overrides.transliterate('GÖDEL, Gödel in São  Paulo and Göttingen')
+  'GODEL, Godel in Sao Paulo and Goettingen'
+
+:copyright: the translitcodec authors and developers, see AUTHORS.
+:license: MIT, see LICENSE for more details.
+
+"""
+import re
+import sys
+import unicodedata
+
+from translitcodec import _mode_table
+
+
+_find_words = re.compile(r'\w+').findall
+_iter_words = re.compile(r'\w+').finditer
+_whole_words = re.compile(r'\w(?:.*\w)?', re.DOTALL).fullmatch
+
+
+class WordOverrides(object):
+    """Transliteration with *mode*, except for the words and phrases in
+    *mapping*, which are replaced by their values as they are.
+
+    Keys start and end with a word character and match whole words only.
+    Words of a phrase may be separated by any run of whitespace, and
+    other characters in a key have to match as they are.  Unless
+    *case_sensitive*, keys match in any case, and a key found in upper
+    case or capitalized gives its value in upper case or capitalized.
+
+    Each text is normalized and scanned once.  At each word, phrases are
+    looked up in a dict once per length of the keys starting with that
+    word, so the time taken follows the length of the text and of the
+    longest phrase, not the size of *mapping*.
+
+    """
+
+    def __init__(self, mapping, mode='long', case_sensitive=True):
+        self.table = _mode_table(mode)
+        self.mode = mode
+        self.case_sensitive = case_sensitive
+        # The values by folded key, with the words of phrases separated
+        # by single spaces, and per first word the word counts of its
+        # keys, the longest first.
+        phrases = {}
+        counts = {}
+        for key, value in mapping.items():
+            key = unicodedata.normalize('NFKC', key)
+            if not _whole_words(key):
+                raise ValueError(
+                    'override key %r does not start and end with a word'
+                    % (key,))
+            words = _find_words(key)
+            phrases.setdefault(self._fold(' '.join(key.split())), value)
+            counts.setdefault(self._fold(words[0]), set()).add(len(words))
+        self._phrases = phrases
+        self._first = {word: sorted(lengths, reverse=True)
+                       for word, lengths in counts.items()}
+
+    def _fold(self, word):
+        return word if self.case_sensitive else word.casefold()
+
+    def transliterate(self, text):
+        """Return *text* transliterated with the overrides applied."""
+        text = unicodedata.normalize('NFKC', text)
+        words = set(_find_words(text))
+        if not self.case_sensitive:
+            words = set(map(str.casefold, words))
+        if self._first.keys().isdisjoint(words):
+            return text.translate(self.table)
+        return self._replace(text)
+
+    def encode(self, input, errors='strict'):
+        """Transliterate like the encoders of the ``translit/<mode>``
+        codecs."""
+        if not isinstance(input, str):
+            input = str(input, sys.getdefaultencoding(), errors)
+        return self.transliterate(input), len(input)
+
+    def _replace(self, text):
+        phrases = self._phrases
+        first = self._first
+        fold = self._fold
+        matches = list(_iter_words(text))
+        pieces = []
+        position = 0
+        index = 0
+        while index < len(matches):
+            match = matches[index]
+            word = fold(match.group())
+            found = None
+            # One lookup per length of the phrases starting with the word.
+            for count in first.get(word, ()):
+                if index + count > len(matches):
+                    continue
+                end = matches[index + count - 1].end()
+                key = word if count == 1 else fold(' '.join(
+                    text[match.start():end].split()))
+                if key in phrases:
+                    found = count, end, phrases[key]
+                    break
+            if found is None:
+                index += 1
+                continue
+            count, end, value = found
+            if not self.case_sensitive:
+                value = _match_case(text[match.start():end], value)
+            pieces.append(text[position:match.start()].translate(self.table))
+            pieces.append(value)
+            position = end
+            index += count
+        pieces.append(text[position:].translate(self.table))
+        return ''.join(pieces)
+
+
+def _match_case(source, value):
+    if source.isupper():
+        return value.upper()
+    if source[:1].isupper():
+        return value[:1].upper() + value[1:]
+    return value